@@ -0,0 +1,31 @@
+import os
+
+from dotenv import load_dotenv
+
+# Load environment variables from .env file before any setting below is read.
+load_dotenv()
+
+# Environment-derived settings, read once at import time. Modules import these
+# constants instead of calling os.environ.get() themselves.
+POLYGON_API_KEY = os.environ.get("POLYGON_API_KEY")
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+
+# Enables asyncio debug mode on the server's event loop. Debug mode adds
+# per-callback and per-await checks, so it stays off unless MCP_DEBUG=1, even if
+# PYTHONASYNCIODEBUG is set in the environment.
+MCP_DEBUG = os.environ.get("MCP_DEBUG") == "1"
+
+# Maximum number of entries kept by each in-process result cache.
+POLYGON_LRU_MAXSIZE = int(os.environ.get("POLYGON_LRU_MAXSIZE", "1024"))
+
+# Maximum number of indicator requests in flight to Polygon at once. Bursts beyond
+# this wait their turn instead of tripping Polygon's rate limit.
+POLYGON_MAX_CONCURRENCY = int(os.environ.get("POLYGON_MAX_CONCURRENCY", "8"))
+
+# Seconds a cached indicator response is reused for daily and longer timespans.
+# Intraday timespans expire sooner, but never later than this; 0 disables reuse.
+POLYGON_CACHE_TTL = float(os.environ.get("POLYGON_CACHE_TTL", "3600"))
+
+# Redis URL (e.g. redis://localhost:6379/0) of a cache shared by every server
+# replica. Unset by default, which keeps caching in process only.
+REDIS_URL = os.environ.get("REDIS_URL")
@@ -1,6 +0,0 @@
-def main():
-    print("Hello from polygon-mcp!")
-
-
-if __name__ == "__main__":
-    main()
@@ -1,62 +1,107 @@
-import os
+import asyncio
 import logging
-from dotenv import load_dotenv
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import anyio
+
+# uvloop is a drop-in, libuv-backed asyncio event loop; it is not available on Windows.
+if os.name != 'nt':
+    import uvloop
+else:
+    uvloop = None
 
-from mcp.server.fastmcp import FastMCP
 # Context might be needed if tools require access to server context, but not for now.
 # from mcp.server.fastmcp import Context 
+from mcp.server.fastmcp import FastMCP
+
+# Importing config loads the .env file and reads the environment once.
+from config import LOG_LEVEL, MCP_DEBUG, POLYGON_API_KEY
 
 # Import tool registration functions
+from tools import polygon_client, shared_cache
 from tools.ohlcv_tools import register_tools as register_ohlcv_tools
-from tools.technical_indicator_tools import register_tools as register_technical_indicator_tools
+from tools.technical_indicator_tools import (
+    register_tools as register_technical_indicator_tools,
+)
 
 # Configure basic logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logging.basicConfig(level=LOG_LEVEL, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Load environment variables from .env file
-load_dotenv()
+# Check for POLYGON_API_KEY once at startup, before any tools are registered.
+# Every tool needs it, and the tools themselves no longer check for it on each call.
+if not POLYGON_API_KEY:
+    logger.critical("POLYGON_API_KEY environment variable is not set.")
+    raise SystemExit("POLYGON_API_KEY is required to run the Polygon MCP server.")
+logger.info("POLYGON_API_KEY environment variable found.")
+
+# FastMCP enters the lifespan once per session (i.e. per SSE connection), not once
+# per process, while the Polygon client and Redis pool are shared by all sessions.
+_open_sessions = 0
+
+@asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """
+    Connects to Polygon in the background when the first session starts, and
+    closes the shared Polygon HTTP client (and the shared Redis cache, if any)
+    when the last open session ends.
+    """
+    global _open_sessions
+    _open_sessions += 1
+    warm_up = asyncio.create_task(polygon_client.warm_up()) if _open_sessions == 1 else None
+    try:
+        yield
+    finally:
+        _open_sessions -= 1
+        if warm_up is not None:
+            warm_up.cancel()
+        if _open_sessions == 0:
+            await polygon_client.aclose()
+            await shared_cache.aclose()
 
-# This FastMCP instance will be discovered by 'mcp dev main.py'
+# This FastMCP instance will be discovered by 'mcp dev server.py'
 # Standard names are 'mcp', 'server', or 'app'.
 mcp = FastMCP(
     "PolygonMCPServer",
-    dependencies=["httpx"]  # httpx is used by our tools
+    dependencies=["httpx"],  # httpx is used by our tools
+    lifespan=lifespan
 )
-logger.info(f"MCP Server '{mcp.name}' initialized.") # Assuming .name attribute from docs
+logger.info("MCP Server '%s' initialized.", mcp.name) # Assuming .name attribute from docs
 
-# Register OHLCV tools
+# Register all tool groups. Each register_tools logs its own tools and returns how many it registered.
 try:
-    register_ohlcv_tools(mcp)
-    logger.info("OHLCV tools registration process initiated via register_ohlcv_tools.")
-except Exception as e:
-    logger.error(f"Failed to register OHLCV tools via register_ohlcv_tools: {e}", exc_info=True)
-
-# Register technical indicator tools
-try:
-    register_technical_indicator_tools(mcp)
-    logger.info("Technical indicator tools registration process initiated via technical_indicator_tools.register_tools.")
-except Exception as e:
-    logger.error(f"Failed to register technical indicator tools: {e}", exc_info=True)
+    tool_count = 0
+    for register_fn in (register_ohlcv_tools, register_technical_indicator_tools):
+        tool_count += register_fn(mcp)
+    logger.info("Registered %d tool(s) in total.", tool_count)
+except Exception:
+    logger.exception("Failed to register tools.")
 
 
-# Check for POLYGON_API_KEY. This is relevant for the tools' operation.
-if not os.environ.get("POLYGON_API_KEY"):
-    logger.critical("POLYGON_API_KEY environment variable is not set.")
-    logger.critical("The Polygon API tools will likely fail during execution.")
-else:
-    logger.info("POLYGON_API_KEY environment variable found.")
+def _new_event_loop() -> asyncio.AbstractEventLoop:
+    """Creates the event loop the server runs on when started directly."""
+    loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+    # Eager tasks run synchronously up to their first suspending await, so tool
+    # calls that never actually block skip a full trip through the scheduler.
+    loop.set_task_factory(asyncio.eager_task_factory)
+    loop.set_debug(MCP_DEBUG)
+    return loop
 
-# This block allows running the server directly using 'python main.py'
+# This block allows running the server directly using 'python server.py'
 if __name__ == "__main__":
-    logger.info("Starting Polygon MCP Server application via direct execution (`python main.py`)...")
-    # The `mcp dev main.py` command will likely discover and run `mcp`
+    logger.info("Starting Polygon MCP Server application via direct execution (`python server.py`)...")
+    # The `mcp dev server.py` command will likely discover and run `mcp`
     # without executing this __main__ block's mcp.run().
     try:
-        mcp.run() # This is a blocking call that starts the server.
+        # Equivalent to mcp.run() for the default stdio transport, but on our own
+        # loop so uvloop and the eager task factory are in place before the
+        # server schedules its handlers. This is a blocking call.
+        anyio.run(mcp.run_stdio_async, backend_options={"loop_factory": _new_event_loop})
     except KeyboardInterrupt:
         logger.info("Server stopped by user (KeyboardInterrupt).")
     except Exception as e:
-        logger.error(f"Server exited with an error: {e}", exc_info=True)
+        logger.error("Server exited with an error: %s", e, exc_info=True)
     finally:
         logger.info("Server has shut down.")
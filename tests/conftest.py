@@ -0,0 +1,28 @@
+from typing import Callable, List
+
+import httpx
+import pytest
+
+from tools import polygon_client
+
+
+@pytest.fixture
+def polygon_api(monkeypatch: pytest.MonkeyPatch) -> Callable[..., List[httpx.Request]]:
+    """
+    Replaces the shared Polygon client with one backed by httpx.MockTransport.
+
+    Call the fixture with a handler (request -> response); it returns the list
+    the requests sent to the handler are recorded in.
+    """
+    def install(handler: Callable[[httpx.Request], httpx.Response]) -> List[httpx.Request]:
+        requests: List[httpx.Request] = []
+
+        def record(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return handler(request)
+
+        client = httpx.AsyncClient(base_url=polygon_client.BASE_URL, transport=httpx.MockTransport(record))
+        monkeypatch.setattr(polygon_client, "_CLIENT", client)
+        return requests
+
+    return install
@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+from tools import cache
+from tools.cache import LRUCache
+
+
+def test_set_evicts_least_recently_used():
+    lru = LRUCache(maxsize=2)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    lru.get("a")  # "b" is now the least recently used
+    lru.set("c", 3)
+    assert lru.get("b") is None
+    assert lru.get("a") == 1
+    assert lru.get("c") == 3
+    assert len(lru) == 2
+
+
+def test_get_expires_entries_after_ttl(monkeypatch: pytest.MonkeyPatch):
+    now = 1000.0
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now)
+    lru = LRUCache()
+    lru.set("short", 1, ttl=10)
+    lru.set("forever", 2)
+    now += 10
+    assert lru.get("short") is None
+    assert lru.get("forever") == 2
+    assert len(lru) == 1
+
+
+def test_get_or_fetch_coalesces_concurrent_misses():
+    calls = []
+
+    async def fetch(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return {"value": value}
+
+    async def main():
+        lru = LRUCache()
+        results = await asyncio.gather(*(lru.get_or_fetch("k", None, fetch, 1) for _ in range(5)))
+        assert results == [{"value": 1}] * 5
+        assert await lru.get_or_fetch("k", None, fetch, 2) == {"value": 1}
+        assert not lru._inflight
+
+    asyncio.run(main())
+    assert calls == [1]
+
+
+@pytest.mark.parametrize("result", [{"error": "boom"}, {"message": "No data"}])
+def test_get_or_fetch_does_not_cache_error_results(result):
+    calls = []
+
+    async def fetch():
+        calls.append(None)
+        return result
+
+    async def main():
+        lru = LRUCache()
+        assert await lru.get_or_fetch("k", None, fetch) == result
+        assert await lru.get_or_fetch("k", None, fetch) == result
+        assert len(lru) == 0
+
+    asyncio.run(main())
+    assert len(calls) == 2
+
+
+def test_get_or_fetch_with_eager_tasks_leaves_nothing_in_flight():
+    async def fetch():
+        return {"value": 1}  # Completes without suspending, so the eager task is done at once
+
+    async def main():
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+        lru = LRUCache()
+        assert await lru.get_or_fetch("k", None, fetch) == {"value": 1}
+        assert not lru._inflight
+        assert lru.get("k") == {"value": 1}
+
+    asyncio.run(main())
+
+
+def test_get_or_fetch_survives_a_cancelled_waiter():
+    async def main():
+        gate = asyncio.Event()
+
+        async def fetch():
+            await gate.wait()
+            return {"value": 1}
+
+        lru = LRUCache()
+        first = asyncio.ensure_future(lru.get_or_fetch("k", None, fetch))
+        second = asyncio.ensure_future(lru.get_or_fetch("k", None, fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        gate.set()
+        assert await second == {"value": 1}
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert lru.get("k") == {"value": 1}
+
+    asyncio.run(main())
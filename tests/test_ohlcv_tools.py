@@ -0,0 +1,158 @@
+import asyncio
+from datetime import UTC, datetime
+
+import httpx
+import pytest
+
+from tools import ohlcv_tools
+from tools.ohlcv_tools import (
+    _HISTORICAL_TTL,
+    _INTRADAY_TTL,
+    _bars_by_column,
+    _daily_ttl,
+    _normalize_ticker,
+    _validate,
+    get_daily_ticker_summaries,
+    get_previous_day_bar,
+    get_previous_day_bars,
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    ohlcv_tools._RESPONSE_CACHE._data.clear()
+    ohlcv_tools._MARKET_SUMMARY_CACHE._data.clear()
+
+
+@pytest.mark.parametrize(
+    "ticker",
+    ["AAPL", "BRK.A", "I:SPX", "X:BTCUSD", "X:1INCHUSD", "O:SPY251219C00650000", "AGNCpM"],
+)
+def test_validate_accepts_polygon_tickers(ticker):
+    assert _validate(ticker) is None
+
+
+@pytest.mark.parametrize("ticker", ["", "AA PL", "AAPL/X", "A" * 41])
+def test_validate_rejects_malformed_tickers(ticker):
+    assert _validate(ticker) == {"error": "Invalid ticker format", "ticker": ticker}
+
+
+def test_validate_checks_dates():
+    assert _validate("AAPL", "2024-01-02") is None
+    assert _validate(None, "01/02/2024") == {"error": "Invalid date format, expected YYYY-MM-DD", "date": "01/02/2024"}
+    assert _validate("AAPL", "1704153600000", date_re=ohlcv_tools._RANGE_BOUND_RE) is None
+
+
+def test_normalize_ticker_only_upper_cases_all_lowercase_tickers():
+    assert _normalize_ticker("aapl") == "AAPL"
+    assert _normalize_ticker("x:btcusd") == "X:BTCUSD"
+    assert _normalize_ticker("AGNCpM") == "AGNCpM"
+
+
+def test_bars_by_column():
+    results = {
+        "AAPL": {"T": "AAPL", "o": 1.0, "h": 2.0, "l": 0.5, "c": 1.5, "v": 10.0, "t": 1},
+        "I:SPX": {"T": "I:SPX", "o": 3.0, "h": 4.0, "l": 2.5, "c": 3.5, "t": 1},
+        "NOPE": {"message": "No data"},
+    }
+    columns = _bars_by_column("2024-01-02", ["AAPL", "NOPE", "I:SPX"], results)
+    assert columns["date"] == "2024-01-02"
+    assert columns["tickers"] == ["AAPL", "I:SPX"]
+    assert columns["c"] == [1.5, 3.5]
+    assert columns["v"] == [10.0, None]
+    assert columns["unavailable"] == {"NOPE": {"message": "No data"}}
+
+
+def test_get_previous_day_bar_decodes_index_bars_without_volume(polygon_api):
+    bar = {"T": "I:SPX", "o": 1.0, "c": 2.0, "h": 3.0, "l": 0.5, "t": 1704153600000}
+    polygon_api(lambda request: httpx.Response(200, json={"status": "OK", "resultsCount": 1, "results": [bar]}))
+    assert asyncio.run(get_previous_day_bar("I:SPX")) == bar
+
+
+def test_get_previous_day_bar_reports_unexpected_responses(polygon_api):
+    polygon_api(lambda request: httpx.Response(200, json={"status": "OK", "resultsCount": 1, "results": [{"T": "AAPL"}]}))
+    result = asyncio.run(get_previous_day_bar("AAPL"))
+    assert result["error"].startswith("Unexpected response from Polygon API")
+    assert "details" in result
+
+
+def test_daily_ttl_follows_the_new_york_date(monkeypatch: pytest.MonkeyPatch):
+    class FixedDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            # 00:30 UTC on Jan 16 is still 19:30 on Jan 15 in New York (after-hours).
+            return datetime(2024, 1, 16, 0, 30, tzinfo=UTC).astimezone(tz)
+
+    monkeypatch.setattr(ohlcv_tools, "datetime", FixedDatetime)
+    assert _daily_ttl("2024-01-15") == _INTRADAY_TTL
+    assert _daily_ttl("2024-01-14") == _HISTORICAL_TTL
+
+
+_MONDAY = 1704672000000  # 2024-01-08, a Monday
+_SUNDAY = 1704585600000  # 2024-01-07
+
+
+def _bar(ticker, t, close=1.0):
+    return {"T": ticker, "o": 1.0, "h": 1.0, "l": 1.0, "c": close, "v": 1.0, "t": t}
+
+
+def _previous_day_bars_api(prev_bars, grouped_bars):
+    def handler(request):
+        path = request.url.path
+        if path.startswith("/v2/aggs/grouped/"):
+            return httpx.Response(200, json={"status": "OK", "results": grouped_bars})
+        ticker = path.split("/")[4]
+        bar = prev_bars.get(ticker)
+        return httpx.Response(200, json={"status": "OK", "resultsCount": int(bar is not None), "results": [bar] if bar else []})
+    return handler
+
+
+def test_get_previous_day_bars_fills_from_the_grouped_bars(polygon_api):
+    requests = polygon_api(_previous_day_bars_api(
+        {"AAPL": _bar("AAPL", _MONDAY), "OTCX": _bar("OTCX", _MONDAY, 7.0)},
+        [_bar("MSFT", _MONDAY, 2.0), _bar("NVDA", _MONDAY, 3.0)],
+    ))
+    result = asyncio.run(get_previous_day_bars(["aapl", "MSFT", "OTCX", "AAPL"]))
+    assert [request.url.path for request in requests] == [
+        "/v2/aggs/ticker/AAPL/prev",
+        "/v2/aggs/grouped/locale/us/market/stocks/2024-01-08",
+        "/v2/aggs/ticker/OTCX/prev",
+    ]
+    assert result["date"] == "2024-01-08"
+    assert result["tickers"] == ["AAPL", "MSFT", "OTCX"]
+    assert result["c"] == [1.0, 2.0, 7.0]
+
+
+def test_get_previous_day_bars_takes_the_date_from_a_stock_ticker(polygon_api):
+    requests = polygon_api(_previous_day_bars_api(
+        {"X:BTCUSD": _bar("X:BTCUSD", _SUNDAY, 5.0), "AAPL": _bar("AAPL", _MONDAY)},
+        [_bar("MSFT", _MONDAY, 2.0)],
+    ))
+    result = asyncio.run(get_previous_day_bars(["X:BTCUSD", "AAPL", "MSFT"]))
+    assert requests[0].url.path == "/v2/aggs/ticker/AAPL/prev"
+    assert requests[1].url.path == "/v2/aggs/grouped/locale/us/market/stocks/2024-01-08"
+    assert result["date"] == "2024-01-08"
+    assert result["tickers"] == ["X:BTCUSD", "AAPL", "MSFT"]
+    assert result["c"] == [5.0, 1.0, 2.0]
+
+
+def test_get_previous_day_bars_skips_the_grouped_bars_for_crypto_dates(polygon_api):
+    requests = polygon_api(_previous_day_bars_api(
+        {"X:BTCUSD": _bar("X:BTCUSD", _SUNDAY, 5.0), "X:ETHUSD": _bar("X:ETHUSD", _SUNDAY, 6.0)},
+        [],
+    ))
+    result = asyncio.run(get_previous_day_bars(["X:BTCUSD", "X:ETHUSD"]))
+    assert not any(request.url.path.startswith("/v2/aggs/grouped/") for request in requests)
+    assert result["tickers"] == ["X:BTCUSD", "X:ETHUSD"]
+    assert result["c"] == [5.0, 6.0]
+
+
+def test_get_daily_ticker_summaries_filters_one_cached_grouped_request(polygon_api):
+    requests = polygon_api(_previous_day_bars_api({}, [_bar("AAPL", _MONDAY), _bar("MSFT", _MONDAY, 2.0)]))
+    result = asyncio.run(get_daily_ticker_summaries(["msft", "NOPE", "AAPL"], "2024-01-08"))
+    assert result["tickers"] == ["MSFT", "AAPL"]
+    assert result["c"] == [2.0, 1.0]
+    assert result["unavailable"] == {"NOPE": {"message": "No daily bar found for NOPE on 2024-01-08."}}
+
+    asyncio.run(get_daily_ticker_summaries(["AAPL"], "2024-01-08"))
+    assert [request.url.path for request in requests] == ["/v2/aggs/grouped/locale/us/market/stocks/2024-01-08"]
@@ -0,0 +1,99 @@
+import asyncio
+
+import httpx
+import pytest
+
+from tools import polygon_client
+from tools.polygon_client import (
+    _MAX_RETRY_DELAY,
+    _RETRY_JITTER,
+    _retry_after_delay,
+    get_with_retry,
+)
+
+
+@pytest.fixture(autouse=True)
+def no_retry_waits(monkeypatch: pytest.MonkeyPatch):
+    """Retries happen immediately, so tests don't sleep through the backoff."""
+    monkeypatch.setattr(polygon_client, "_backoff_delay", lambda attempt: 0)
+    monkeypatch.setattr(polygon_client, "_retry_after_delay", lambda response, attempt: 0)
+
+
+@pytest.mark.parametrize(
+    ("headers", "attempt", "expected"),
+    [
+        ({"Retry-After": "3"}, 0, 3.0),
+        ({"Retry-After": "600"}, 0, _MAX_RETRY_DELAY),
+        ({}, 2, 4.0),
+        ({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}, 1, 2.0),
+    ],
+)
+def test_retry_after_delay(headers, attempt, expected):
+    delay = _retry_after_delay(httpx.Response(429, headers=headers), attempt)
+    assert expected <= delay <= expected + _RETRY_JITTER
+
+
+def test_get_with_retry_retries_transient_statuses(polygon_api):
+    statuses = iter([429, 503, 200])
+    requests = polygon_api(lambda request: httpx.Response(next(statuses), json={}))
+    response = asyncio.run(get_with_retry("/v1/test", {"a": "1"}))
+    assert response.status_code == 200
+    assert len(requests) == 3
+    assert all(request.url.params["a"] == "1" for request in requests)
+
+
+def test_get_with_retry_returns_other_errors_as_is(polygon_api):
+    requests = polygon_api(lambda request: httpx.Response(404, json={}))
+    assert asyncio.run(get_with_retry("/v1/test")).status_code == 404
+    assert len(requests) == 1
+
+
+def test_get_with_retry_gives_up_after_max_retries(polygon_api):
+    requests = polygon_api(lambda request: httpx.Response(502))
+    assert asyncio.run(get_with_retry("/v1/test", max_retries=2)).status_code == 502
+    assert len(requests) == 3
+
+
+def test_get_with_retry_retries_connection_errors(polygon_api):
+    def handler(request):
+        if len(requests) == 1:
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(200, json={})
+
+    requests = polygon_api(handler)
+    assert asyncio.run(get_with_retry("/v1/test")).status_code == 200
+    assert len(requests) == 2
+
+    def unreachable(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    requests = polygon_api(unreachable)
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(get_with_retry("/v1/test", max_retries=1))
+    assert len(requests) == 2
+
+
+def test_get_with_retry_closes_streamed_responses_before_retrying(polygon_api):
+    statuses = iter([503, 200])
+
+    async def body():
+        yield b"{}"
+
+    # An async body keeps the mocked responses unread until the caller reads them.
+    polygon_api(lambda request: httpx.Response(next(statuses), content=body()))
+    responses = []
+
+    async def record(response):
+        responses.append(response)
+
+    polygon_client._CLIENT.event_hooks["response"] = [record]
+
+    async def main():
+        response = await get_with_retry("/v1/test", stream=True)
+        assert not response.is_closed
+        await response.aread()
+        await response.aclose()
+
+    asyncio.run(main())
+    assert [response.status_code for response in responses] == [503, 200]
+    assert responses[0].is_closed
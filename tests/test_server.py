@@ -0,0 +1,35 @@
+import asyncio
+import importlib
+
+import pytest
+
+import config
+from tools import polygon_client, shared_cache
+
+
+@pytest.fixture
+def server(monkeypatch: pytest.MonkeyPatch):
+    """Imports the server module with a placeholder API key, so it doesn't exit."""
+    monkeypatch.setattr(config, "POLYGON_API_KEY", "test-key")
+    return importlib.import_module("server")
+
+
+def test_lifespan_closes_shared_clients_after_the_last_session(server, monkeypatch: pytest.MonkeyPatch):
+    calls = []
+
+    async def record(name):
+        calls.append(name)
+
+    monkeypatch.setattr(polygon_client, "warm_up", lambda: record("warm_up"))
+    monkeypatch.setattr(polygon_client, "aclose", lambda: record("polygon_client.aclose"))
+    monkeypatch.setattr(shared_cache, "aclose", lambda: record("shared_cache.aclose"))
+
+    async def main():
+        async with server.lifespan(server.mcp):
+            async with server.lifespan(server.mcp):
+                await asyncio.sleep(0)  # Let the warm-up task run
+            assert calls == ["warm_up"]
+        assert server._open_sessions == 0
+
+    asyncio.run(main())
+    assert calls == ["warm_up", "polygon_client.aclose", "shared_cache.aclose"]
@@ -0,0 +1,142 @@
+import asyncio
+import types
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+import orjson
+import pytest
+
+from tools import cache, shared_cache, technical_indicator_tools
+
+
+class FakeRedisError(Exception):
+    pass
+
+
+class FakePipeline:
+    def __init__(self, client: "FakeRedis"):
+        self.client = client
+        self.commands: List[Tuple[str, str]] = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        pass
+
+    def get(self, key: str) -> "FakePipeline":
+        self.commands.append(("get", key))
+        return self
+
+    def pttl(self, key: str) -> "FakePipeline":
+        self.commands.append(("pttl", key))
+        return self
+
+    async def execute(self) -> List[Any]:
+        if self.client.fail:
+            raise FakeRedisError("timed out")
+        results = []
+        for command, key in self.commands:
+            raw, pttl = self.client.store.get(key, (None, -2))
+            results.append(raw if command == "get" else pttl)
+        return results
+
+
+class FakeRedis:
+    """Just enough of redis.asyncio.Redis for the shared cache."""
+
+    def __init__(self):
+        self.store: Dict[str, Tuple[bytes, int]] = {}
+        self.fail = False
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    async def set(self, key: str, value: bytes, px: Optional[int] = None) -> None:
+        if self.fail:
+            raise FakeRedisError("timed out")
+        self.store[key] = (value, px if px is not None else -1)
+
+
+@pytest.fixture
+def fake_redis(monkeypatch: pytest.MonkeyPatch) -> FakeRedis:
+    client = FakeRedis()
+    monkeypatch.setattr(shared_cache, "redis", types.SimpleNamespace(RedisError=FakeRedisError))
+    monkeypatch.setattr(shared_cache, "_get_redis", lambda: client)
+    return client
+
+
+@pytest.fixture(autouse=True)
+def empty_indicator_cache():
+    technical_indicator_tools._INDICATOR_CACHE._data.clear()
+
+
+def test_get_redis_uses_short_timeouts(monkeypatch: pytest.MonkeyPatch):
+    calls = []
+    fake_module = types.SimpleNamespace(from_url=lambda url, **kwargs: calls.append((url, kwargs)) or object())
+    monkeypatch.setattr(shared_cache, "redis", fake_module)
+    monkeypatch.setattr(shared_cache, "REDIS_URL", "redis://cache:6379/0")
+    monkeypatch.setattr(shared_cache, "_REDIS", None)
+    assert shared_cache._get_redis() is not None
+    assert calls == [("redis://cache:6379/0", {"socket_connect_timeout": 0.5, "socket_timeout": 0.5})]
+
+
+def test_disabled_without_redis_url(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(shared_cache, "REDIS_URL", None)
+    monkeypatch.setattr(shared_cache, "_REDIS", None)
+    assert asyncio.run(shared_cache.get_json("k")) is None
+    asyncio.run(shared_cache.set_json("k", {"a": 1}, 60))
+
+
+def test_set_json_and_get_json_round_trip(fake_redis: FakeRedis):
+    asyncio.run(shared_cache.set_json("k", {"a": 1}, 1.5))
+    assert fake_redis.store["k"] == (b'{"a":1}', 1500)
+    assert asyncio.run(shared_cache.get_json("k")) == ({"a": 1}, 1.5)
+    assert asyncio.run(shared_cache.get_json("missing")) is None
+
+
+def test_get_json_treats_corrupt_entries_and_errors_as_misses(fake_redis: FakeRedis):
+    fake_redis.store["k"] = (b"{corrupt", 1000)
+    assert asyncio.run(shared_cache.get_json("k")) is None
+    fake_redis.fail = True
+    assert asyncio.run(shared_cache.get_json("k")) is None
+    asyncio.run(shared_cache.set_json("k", {"a": 1}, 60))  # Logged, not raised
+
+
+def _indicator_response(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json={"status": "OK", "results": {"values": [{"timestamp": 1, "value": 1.5}]}})
+
+
+def test_indicator_miss_is_written_to_redis(fake_redis: FakeRedis, polygon_api):
+    requests = polygon_api(_indicator_response)
+    result = asyncio.run(technical_indicator_tools.get_sma("AAPL"))
+    assert len(requests) == 1
+    [(raw, px)] = fake_redis.store.values()
+    assert orjson.loads(raw) == result
+    assert px == int(technical_indicator_tools.POLYGON_CACHE_TTL * 1000)
+
+
+def test_indicator_redis_hit_skips_polygon_and_keeps_only_its_remaining_ttl(
+    fake_redis: FakeRedis, polygon_api, monkeypatch: pytest.MonkeyPatch
+):
+    requests = polygon_api(_indicator_response)
+    asyncio.run(technical_indicator_tools.get_sma("AAPL", timespan="minute"))
+    [key] = fake_redis.store
+    cached = {"status": "OK", "results": {"values": [{"timestamp": 2, "value": 2.5}]}}
+    fake_redis.store[key] = (orjson.dumps(cached), 5000)  # Another replica's entry, 5s left
+    technical_indicator_tools._INDICATOR_CACHE._data.clear()
+
+    now = 1000.0
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now)
+    assert asyncio.run(technical_indicator_tools.get_sma("AAPL", timespan="minute")) == cached
+    assert len(requests) == 1
+
+    [(expires_at, _)] = technical_indicator_tools._INDICATOR_CACHE._data.values()
+    assert expires_at == now + 5.0
+
+
+def test_indicator_falls_back_to_polygon_when_redis_fails(fake_redis: FakeRedis, polygon_api):
+    fake_redis.fail = True
+    requests = polygon_api(_indicator_response)
+    assert asyncio.run(technical_indicator_tools.get_sma("AAPL"))["status"] == "OK"
+    assert len(requests) == 1
@@ -0,0 +1,113 @@
+import asyncio
+
+import httpx
+import pytest
+
+from tools import technical_indicator_tools
+from tools.technical_indicator_tools import (
+    _indicator_params,
+    _IndicatorQuery,
+    get_ema,
+    get_indicators_bulk,
+    get_indicators_bundle,
+    get_macd,
+    get_sma,
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_indicator_cache():
+    technical_indicator_tools._INDICATOR_CACHE._data.clear()
+
+
+def test_indicator_params_leaves_out_none_arguments():
+    query = _IndicatorQuery(None, "2024-01-01", None, None, None, "day", False, None, None, "asc", None)
+    assert _indicator_params(query, {"short_window": 12, "long_window": None}) == {
+        "timestamp.gte": "2024-01-01",
+        "timespan": "day",
+        "adjusted": "false",
+        "short_window": 12,
+        "order": "asc",
+    }
+
+
+def _indicator_api(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, json={"status": "OK", "results": {"values": [{"timestamp": 1, "value": 1.5}]}})
+
+
+def test_get_indicators_bundle_fetches_each_indicator_with_its_default_windows(polygon_api):
+    requests = polygon_api(_indicator_api)
+    result = asyncio.run(get_indicators_bundle("AAPL", ["rsi", "macd", "rsi"]))
+    assert list(result) == ["rsi", "macd"]
+    assert result["rsi"]["results"]["values"] == [{"timestamp": 1, "value": 1.5}]
+    params = {request.url.path: dict(request.url.params) for request in requests}
+    assert params["/v1/indicators/rsi/AAPL"]["window"] == "14"
+    macd = params["/v1/indicators/macd/AAPL"]
+    assert (macd["short_window"], macd["long_window"], macd["signal_window"]) == ("12", "26", "9")
+    assert len(requests) == 2
+
+
+def test_get_indicators_bundle_rejects_unknown_indicators(polygon_api):
+    requests = polygon_api(_indicator_api)
+    result = asyncio.run(get_indicators_bundle("AAPL", ["sma", "vwap"]))
+    assert result["error"].startswith("Unknown indicator(s): vwap.")
+    assert not requests
+
+
+def test_get_indicators_bulk_fetches_each_ticker(polygon_api):
+    requests = polygon_api(_indicator_api)
+    result = asyncio.run(get_indicators_bulk("sma", ["MSFT", "AAPL", "MSFT"]))
+    assert list(result) == ["MSFT", "AAPL"]
+    assert all(value["status"] == "OK" for value in result.values())
+    assert sorted(request.url.path for request in requests) == ["/v1/indicators/sma/AAPL", "/v1/indicators/sma/MSFT"]
+    assert all(request.url.params["window"] == "50" for request in requests)
+
+
+@pytest.mark.parametrize(
+    ("indicator", "tickers", "error"),
+    [("vwap", ["AAPL"], "Unknown indicator: vwap."), ("sma", [], "At least one ticker is required.")],
+)
+def test_get_indicators_bulk_rejects_bad_arguments(polygon_api, indicator, tickers, error):
+    requests = polygon_api(_indicator_api)
+    assert asyncio.run(get_indicators_bulk(indicator, tickers))["error"].startswith(error)
+    assert not requests
+
+
+def test_get_macd_decodes_signal_histogram_and_underlying(polygon_api):
+    body = {
+        "status": "OK",
+        "request_id": "abc",
+        "count": 1,  # Not part of the tool output
+        "results": {
+            "values": [{"timestamp": 1, "value": 0.5, "signal": 0.25, "histogram": 0.25}],
+            "underlying": {"url": "https://api.polygon.io/v2/aggs/...", "aggregates": [{"c": 1.0, "t": 1}]},
+        },
+    }
+    polygon_api(lambda request: httpx.Response(200, json=body))
+    result = asyncio.run(get_macd("AAPL", expand_underlying=True))
+    del body["count"]
+    assert result == body
+
+
+def test_get_macd_reports_non_ok_statuses(polygon_api):
+    body = {"status": "ERROR", "request_id": "abc", "error": "Unknown ticker"}
+    polygon_api(lambda request: httpx.Response(200, json=body))
+    assert asyncio.run(get_macd("NOPE")) == {"error": "Unknown ticker", "details": body}
+
+
+def test_indicator_cache_keys_on_indicator_and_window(polygon_api):
+    requests = polygon_api(_indicator_api)
+
+    async def main():
+        await get_sma("AAPL")
+        await get_sma("AAPL", window=20)
+        await get_ema("AAPL", window=20)
+        await get_sma("AAPL", window=50)  # Same as the first call
+        await get_ema("AAPL", window=20)
+
+    asyncio.run(main())
+    assert [(request.url.path, request.url.params["window"]) for request in requests] == [
+        ("/v1/indicators/sma/AAPL", "50"),
+        ("/v1/indicators/sma/AAPL", "20"),
+        ("/v1/indicators/ema/AAPL", "20"),
+    ]
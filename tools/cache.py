@@ -0,0 +1,95 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class LRUCache:
+    """
+    A small in-process least-recently-used cache for Polygon API results.
+
+    Entries may carry a time-to-live, after which they are treated as missing.
+    Only successful results should be stored; callers keep error responses out
+    so that a transient failure is retried on the next call.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        # key -> (monotonic expiry time or None for no expiry, value)
+        self._data: "OrderedDict[Hashable, Tuple[Optional[float], Any]]" = OrderedDict()
+        # The fetch in flight for each key with a miss in progress, so that concurrent
+        # misses for the same key share one upstream request.
+        self._inflight: "Dict[Hashable, asyncio.Future[Dict[str, Any]]]" = {}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Returns the cached value for key, or None if it is not cached or has expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Stores value under key, evicting the least recently used entry when full.
+
+        :param ttl: Seconds until the entry expires. None keeps it until evicted.
+        """
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    async def get_or_fetch(
+        self,
+        key: Hashable,
+        ttl: Optional[float],
+        fetch: Callable[..., Awaitable[Dict[str, Any]]],
+        *args: Any
+    ) -> Dict[str, Any]:
+        """
+        Returns the cached result for key, calling fetch(*args) on a miss.
+
+        Concurrent misses for the same key await the fetch already in flight
+        instead of starting their own, so only one request reaches Polygon.
+        Results carrying an "error" or "message" key are returned but not cached.
+        A fetch may store its own entry for key (e.g. with a shorter TTL), which
+        is then kept as is.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._fetch_and_store(key, ttl, fetch, args))
+            # With an eager task factory the fetch may already have finished.
+            if not inflight.done():
+                self._inflight[key] = inflight
+        # Shielded so that a caller that is cancelled (e.g. a client that gave up)
+        # doesn't cancel the fetch for the other callers waiting on it.
+        return await asyncio.shield(inflight)
+
+    async def _fetch_and_store(
+        self,
+        key: Hashable,
+        ttl: Optional[float],
+        fetch: Callable[..., Awaitable[Dict[str, Any]]],
+        args: Tuple[Any, ...]
+    ) -> Dict[str, Any]:
+        """Runs the fetch for a miss on key and caches a successful result."""
+        try:
+            result = await fetch(*args)
+            if "error" not in result and "message" not in result and key not in self._data:
+                self.set(key, result, ttl)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -1,11 +1,122 @@
+import asyncio
+import logging
 import os
-from typing_extensions import List
+import re
+from datetime import UTC, datetime
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple
+from zoneinfo import ZoneInfo
+
 import httpx  # Using httpx for async requests, similar to 'requests' but good for async frameworks
-from typing import Dict, Any, Optional
+import msgspec
+import orjson
+from mcp.server.fastmcp import FastMCP
+from typing_extensions import List
 
-# It's good practice to get API keys from environment variables
-POLYGON_API_KEY = os.environ.get("POLYGON_API_KEY")
-BASE_URL = "https://api.polygon.io"
+# It's good practice to get API keys from environment variables (see config.py)
+from config import POLYGON_API_KEY, POLYGON_LRU_MAXSIZE
+from tools.cache import LRUCache
+from tools.polygon_client import BOOL_STR, aclose, get_with_retry
+
+logger = logging.getLogger(__name__)
+
+# None (a flag passed explicitly as null) maps to Polygon's default for that flag.
+_ADJUSTED_STR = {**BOOL_STR, None: "true"}
+_INCLUDE_OTC_STR = {**BOOL_STR, None: "false"}
+
+# Successful previous-day and daily results are cached in process. A trading day's
+# bars are final once the day is over, so those entries live for a day; data for
+# today can still change and is only reused for a minute.
+_HISTORICAL_TTL = 86400.0
+_INTRADAY_TTL = 60.0
+# The previous-day bar is final too, but which day counts as "previous" rolls over
+# after the close, so those entries (keyed by market date) are refreshed hourly.
+_PREVIOUS_DAY_TTL = 3600.0
+_RESPONSE_CACHE = LRUCache(maxsize=POLYGON_LRU_MAXSIZE)
+# A grouped daily response holds a bar for every US ticker (megabytes each), so
+# only a handful of dates are kept.
+_MARKET_SUMMARY_CACHE = LRUCache(maxsize=8)
+
+# US stock sessions, after-hours included, run on New York time. Until midnight
+# there, today's bars can still change even though the UTC date has moved on.
+_MARKET_TZ = ZoneInfo("America/New_York")
+
+def _market_today() -> str:
+    """Returns today's date (YYYY-MM-DD) in the US stock market's time zone."""
+    return datetime.now(_MARKET_TZ).date().isoformat()
+
+def _daily_ttl(date: str) -> float:
+    """Returns the cache TTL for data on date (YYYY-MM-DD), compared against today in New York."""
+    if date < _market_today():
+        return _HISTORICAL_TTL
+    return _INTRADAY_TTL
+
+# Malformed tickers and dates are rejected locally instead of costing a round trip
+# to Polygon just to get an error back. Tickers may carry a market prefix such as
+# "X:" (crypto), "I:" (indices) or "O:" (options, whose symbols run to ~20 characters),
+# and may start with a digit (e.g. "X:1INCHUSD"). Only clearly malformed strings
+# (empty, too long, spaces or other punctuation) are rejected.
+_TICKER_RE = re.compile(r"^(?:[A-Za-z]:)?[A-Za-z0-9][A-Za-z0-9.\-]{0,39}$")
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+# The range endpoint also accepts Unix millisecond timestamps as bounds.
+_RANGE_BOUND_RE = re.compile(r"^(?:\d{4}-\d{2}-\d{2}|\d+)$")
+
+def _normalize_ticker(ticker: str) -> str:
+    """
+    Upper-cases a ticker given entirely in lowercase (e.g. "aapl"), as callers often
+    send them. Mixed case is kept, since some Polygon tickers contain lowercase
+    letters (e.g. preferred share classes).
+    """
+    return ticker.upper() if ticker.islower() else ticker
+
+def _validate(ticker: Optional[str] = None, *dates: str, date_re: re.Pattern = _DATE_RE) -> Optional[Dict[str, Any]]:
+    """Returns an error result for a malformed ticker or date, or None if they all look valid."""
+    if ticker is not None and not _TICKER_RE.match(ticker):
+        return {"error": "Invalid ticker format", "ticker": ticker}
+    for date in dates:
+        if not date_re.match(date):
+            return {"error": "Invalid date format, expected YYYY-MM-DD", "date": date}
+    return None
+
+# Upper bound on the per-ticker requests a single bulk call has in flight at once.
+# They are multiplexed over the shared HTTP/2 connection, so the cap is only there
+# to keep one huge ticker list from monopolising it.
+_BULK_CONCURRENCY = 64
+
+# Endpoint path templates, relative to the shared client's base URL.
+_PREVIOUS_DAY_BAR_PATH = "/v2/aggs/ticker/{ticker}/prev"
+_CUSTOM_BARS_PATH = "/v2/aggs/ticker/{ticker}/range/{multiplier}/{timespan}/{from_date}/{to_date}"
+# Grouped daily bars are only offered for the US stock market.
+_DAILY_MARKET_SUMMARY_PATH = "/v2/aggs/grouped/locale/us/market/stocks/{date}"
+_DAILY_TICKER_SUMMARY_PATH = "/v1/open-close/{ticker}/{date}"
+
+# Crypto and forex trade through the weekend, so the previous day of one of
+# their tickers need not be a US trading day with grouped stock bars.
+_ROUND_THE_CLOCK_PREFIXES = ("X:", "C:")
+
+# Bar fields returned as columns by get_previous_day_bars.
+_BAR_FIELDS = ("o", "h", "l", "c", "v", "vw", "t", "n")
+
+class _Bar(msgspec.Struct, omit_defaults=True):
+    """A single aggregate bar as returned by Polygon. Index bars (I:) carry no volume fields."""
+    T: str
+    o: float
+    c: float
+    h: float
+    l: float
+    t: int
+    v: Optional[float] = None
+    vw: Optional[float] = None
+    n: Optional[int] = None
+
+class _PreviousDayBarResponse(msgspec.Struct):
+    """The fields of a /v2/aggs/ticker/{ticker}/prev response that get_previous_day_bar reads."""
+    status: str
+    resultsCount: int = 0
+    results: List[_Bar] = []
+
+# Parses and validates a previous-day response in one pass, skipping fields we don't use.
+_PREVIOUS_DAY_BAR_DECODER = msgspec.json.Decoder(_PreviousDayBarResponse)
 
 async def get_previous_day_bar(ticker: str, adjusted: Optional[bool] = True) -> Dict[str, Any]:
     """
@@ -17,54 +128,59 @@ async def get_previous_day_bar(ticker: str, adjusted: Optional[bool] = True) ->
                      Defaults to True.
     :return: A dictionary containing the OHLC data or an error message.
     """
-    if not POLYGON_API_KEY:
-        # This is a server-side configuration error, so we might raise an exception
-        # or return a specific error structure that the MCP server can interpret.
-        return {"error": "Polygon API key is not configured."}
-
-    url = f"{BASE_URL}/v2/aggs/ticker/{ticker}/prev"
+    ticker = _normalize_ticker(ticker)
+    invalid = _validate(ticker)
+    if invalid is not None:
+        return invalid
+    cache_key = ("prev", ticker, _ADJUSTED_STR[adjusted], _market_today())
+    return await _RESPONSE_CACHE.get_or_fetch(cache_key, _PREVIOUS_DAY_TTL, _fetch_previous_day_bar, ticker, adjusted)
+
+async def _fetch_previous_day_bar(ticker: str, adjusted: Optional[bool]) -> Dict[str, Any]:
+    """Fetches the previous-day bar for get_previous_day_bar from Polygon, bypassing the cache."""
+    # The shared client carries the base URL and the API key (as an auth header),
+    # and get_with_retry retries rate-limited and transient failures.
+    path = _PREVIOUS_DAY_BAR_PATH.format(ticker=ticker)
     params = {
-        "adjusted": str(adjusted).lower(), # Polygon API expects 'true' or 'false' as strings
-        "apiKey": POLYGON_API_KEY
+        "adjusted": _ADJUSTED_STR[adjusted], # Polygon API expects 'true' or 'false' as strings
     }
 
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url, params=params)
-            response.raise_for_status()  # Raises an HTTPError for bad responses (4XX or 5XX)
-            data = response.json()
-
-            # According to Polygon docs, results are in a list.
-            # Even for a single previous day, it might be a list with one item.
-            # {"ticker":"AAPL","queryCount":1,"resultsCount":1,"adjusted":true,"results":[{"T":"AAPL","v":12345,"vw":150.00,"o":150.00,"c":150.00,"h":150.00,"l":150.00,"t":1678886400000,"n":1}],"status":"OK","request_id":"someid"}
-            # We should probably return the content of "results" or the first item if present.
-            if data.get("status") == "OK" and "results" in data and data["resultsCount"] > 0:
-                return data["results"][0] # Return the first bar data
-            elif data.get("status") == "OK" and data["resultsCount"] == 0:
-                return {"message": f"No previous day bar data found for {ticker}."}
-            else:
-                # Handle cases like {"status":"ERROR", "error":"Unknown ticker symbol: AAPLX"}
-                # or other non-OK statuses
-                return {"error": data.get("error") or data.get("message", "Failed to fetch data from Polygon API"), "details": data}
-
-        except httpx.HTTPStatusError as e:
-            # Error from Polygon API (e.g., 404 Not Found, 401 Unauthorized if API key is bad)
-            return {"error": f"Polygon API error: {e.response.status_code}", "message": str(e.response.text)}
-        except httpx.RequestError as e:
-            # Network error or other issue with the request
-            return {"error": "Failed to connect to Polygon API", "message": str(e)}
-        except Exception as e:
-            # Catch-all for other unexpected errors
-            # Log this error for debugging
-            print(f"Unexpected error in get_previous_day_bar: {e}")
-            return {"error": "An unexpected error occurred."}
+    try:
+        response = await get_with_retry(path, params)
+        response.raise_for_status()  # Raises an HTTPError for bad responses (4XX or 5XX)
+        resp = _PREVIOUS_DAY_BAR_DECODER.decode(response.content)
+
+        # According to Polygon docs, results are in a list.
+        # Even for a single previous day, it might be a list with one item.
+        # {"ticker":"AAPL","queryCount":1,"resultsCount":1,"adjusted":true,"results":[{"T":"AAPL","v":12345,"vw":150.00,"o":150.00,"c":150.00,"h":150.00,"l":150.00,"t":1678886400000,"n":1}],"status":"OK","request_id":"someid"}
+        # We should probably return the content of "results" or the first item if present.
+        if resp.status == "OK" and resp.resultsCount and resp.results:
+            return msgspec.to_builtins(resp.results[0]) # Return the first bar data
+        elif resp.status == "OK":
+            return {"message": f"No previous day bar data found for {ticker}."}
+        else:
+            # Handle cases like {"status":"ERROR", "error":"Unknown ticker symbol: AAPLX"}
+            # or other non-OK statuses. These are rare, so parse the full body for the details.
+            data = orjson.loads(response.content)
+            return {"error": data.get("error") or data.get("message", "Failed to fetch data from Polygon API"), "details": data}
+
+    except httpx.HTTPStatusError as e:
+        # Error from Polygon API (e.g., 404 Not Found, 401 Unauthorized if API key is bad)
+        return {"error": f"Polygon API error: {e.response.status_code}", "message": e.response.text}
+    except httpx.RequestError as e:
+        # Network error or other issue with the request
+        return {"error": "Failed to connect to Polygon API", "message": str(e)}
+    except (msgspec.ValidationError, msgspec.DecodeError) as e:
+        # A body that doesn't match the expected shape; the raw text is the most useful detail.
+        return {"error": f"Unexpected response from Polygon API: {e}", "details": response.text}
+    # Anything else (including asyncio.CancelledError on shutdown) propagates to
+    # FastMCP, which reports it to the client as a tool error.
 
 # This is how we might define the tool for an MCP server.
 # The exact structure will depend on the Python MCP SDK we use.
 # For now, let's assume it's a dictionary structure.
 # This would typically be collected by the main server module.
 
-PREVIOUS_DAY_BAR_TOOL_DEF: Dict[str, Any] = {
+PREVIOUS_DAY_BAR_TOOL_DEF: Mapping[str, Any] = MappingProxyType({
     "tool_name": "get_previous_day_bar",
     "description": "Retrieves the previous trading day's OHLC data for a stock ticker.",
     "input_schema": {
@@ -81,14 +197,14 @@ PREVIOUS_DAY_BAR_TOOL_DEF: Dict[str, Any] = {
             # Define expected fields based on Polygon's response
             # Example fields:
             "T": {"type": "string", "description": "Ticker symbol."},
-            "v": {"type": "number", "description": "Trading volume."},
-            "vw": {"type": "number", "description": "Volume weighted average price."},
+            "v": {"type": "number", "description": "Trading volume. Absent for index tickers (I:)."},
+            "vw": {"type": "number", "description": "Volume weighted average price. Absent for index tickers (I:)."},
             "o": {"type": "number", "description": "Open price."},
             "c": {"type": "number", "description": "Close price."},
             "h": {"type": "number", "description": "High price."},
             "l": {"type": "number", "description": "Low price."},
             "t": {"type": "integer", "description": "Unix Msec timestamp."},
-            "n": {"type": "integer", "description": "Number of transactions."},
+            "n": {"type": "integer", "description": "Number of transactions. Absent for index tickers (I:)."},
             "error": {"type": "string", "description": "Error message if the call failed."},
             "message": {"type": "string", "description": "Additional message, e.g. if no data found."}
             # We might want to make this more robust, perhaps using a oneOf if there's an error vs success
@@ -96,7 +212,130 @@ PREVIOUS_DAY_BAR_TOOL_DEF: Dict[str, Any] = {
         # A more advanced schema might use "oneOf" to distinguish between success and error shapes
     },
     # "permissions": [] # Explicitly empty or omitted for no permissions, as discussed
-}
+})
+
+async def _gather_bounded(
+    fetch: Callable[[str], Awaitable[Dict[str, Any]]],
+    items: List[str],
+    limit: int = _BULK_CONCURRENCY
+) -> List[Dict[str, Any]]:
+    """Awaits fetch(item) for every item concurrently, at most limit at a time, returning results in order."""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def fetch_one(item: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await fetch(item)
+
+    return await asyncio.gather(*(fetch_one(item) for item in items))
+
+def _bars_by_column(date: str, tickers: List[str], results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Lays out one result per ticker column-wise (one list per bar field, aligned
+    with "tickers") rather than as one dict per ticker: field names are not
+    repeated for every ticker, and each column can be used directly as a
+    numeric series. Results without a bar are listed under "unavailable".
+    """
+    found = [ticker for ticker in tickers if "t" in results[ticker]]
+    columns: Dict[str, Any] = {"date": date, "tickers": found}
+    for field in _BAR_FIELDS:
+        columns[field] = [results[ticker].get(field) for ticker in found]
+    unavailable = {ticker: results[ticker] for ticker in tickers if "t" not in results[ticker]}
+    if unavailable:
+        columns["unavailable"] = unavailable
+    return columns
+
+async def get_previous_day_bars(tickers: List[str], adjusted: Optional[bool] = True) -> Dict[str, Any]:
+    """
+    Retrieves the previous trading day's OHLC data for several stock tickers at once.
+
+    Rather than one request per ticker, this looks up the previous trading day
+    from the first stock or index ticker's bar and then fetches the grouped
+    daily bars for the whole US market on that date in a single request,
+    filtering it down to the requested tickers. Tickers missing from the grouped
+    bars fall back to individual requests, issued concurrently.
+
+    :param tickers: The stock ticker symbols (e.g., ["AAPL", "MSFT"]).
+    :param adjusted: Whether or not the results are adjusted for splits.
+                     Defaults to True.
+    :return: A dictionary with the trading date, the tickers that have a bar, one
+             list per bar field aligned with those tickers, and an error or
+             message for each ticker without a bar.
+    """
+    tickers = list(dict.fromkeys(map(_normalize_ticker, tickers))) # De-duplicate, keeping the caller's order
+    if not tickers:
+        return {"error": "At least one ticker is required."}
+
+    # The previous-day endpoint is the only one that knows which day was the
+    # previous trading day, so probe it until one of the tickers returns a bar.
+    # Stock and index tickers are probed before crypto and forex ones, whose
+    # previous day can be a weekend.
+    results: Dict[str, Any] = {}
+    trading_date = None
+    stock_market_date = False
+    for ticker in sorted(tickers, key=lambda ticker: ticker.startswith(_ROUND_THE_CLOCK_PREFIXES)):
+        bar = await get_previous_day_bar(ticker, adjusted)
+        results[ticker] = bar
+        if "t" in bar:
+            # Daily bar timestamps fall within the US trading day, so the UTC date is the trading date.
+            trading_date = datetime.fromtimestamp(bar["t"] / 1000, tz=UTC).date().isoformat()
+            stock_market_date = not ticker.startswith(_ROUND_THE_CLOCK_PREFIXES)
+            break
+    if trading_date is None:
+        return {"error": "Could not determine the previous trading day for any of the tickers.", "unavailable": results}
+
+    remaining = [ticker for ticker in tickers if ticker not in results]
+    if remaining:
+        # Grouped stock bars only exist for a date a stock or index ticker traded on.
+        if stock_market_date:
+            summary = await get_daily_market_summary(trading_date, adjusted)
+            if "error" not in summary:
+                wanted = set(remaining)
+                for bar in summary.get("results") or []:
+                    if bar.get("T") in wanted:
+                        results[bar["T"]] = bar
+        # Tickers the grouped bars don't cover (e.g. OTC or crypto tickers), or every
+        # ticker if the grouped request failed or was skipped, are fetched one by one,
+        # concurrently.
+        missing = [ticker for ticker in remaining if ticker not in results]
+        if missing:
+            bars = await _gather_bounded(lambda ticker: get_previous_day_bar(ticker, adjusted), missing)
+            results.update(zip(missing, bars))
+
+    return _bars_by_column(trading_date, tickers, results)
+
+PREVIOUS_DAY_BARS_TOOL_DEF: Mapping[str, Any] = MappingProxyType({
+    "tool_name": "get_previous_day_bars",
+    "description": "Retrieves the previous trading day's OHLC data for several stock tickers in one call.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "tickers": {"type": "array", "items": {"type": "string"}, "description": "The stock ticker symbols (e.g., ['AAPL', 'MSFT'])."},
+            "adjusted": {"type": "boolean", "description": "Whether results are adjusted for splits. Defaults to true.", "default": True}
+        },
+        "required": ["tickers"]
+    },
+    "output_schema": {
+        "type": "object",
+        "properties": {
+            "date": {"type": "string", "description": "The previous trading day (YYYY-MM-DD)."},
+            "tickers": {"type": "array", "items": {"type": "string"}, "description": "Tickers with a bar; every field list below is aligned with this list."},
+            "o": {"type": "array", "items": {"type": "number"}, "description": "Open prices."},
+            "h": {"type": "array", "items": {"type": "number"}, "description": "High prices."},
+            "l": {"type": "array", "items": {"type": "number"}, "description": "Low prices."},
+            "c": {"type": "array", "items": {"type": "number"}, "description": "Close prices."},
+            "v": {"type": "array", "items": {"type": ["number", "null"]}, "description": "Trading volumes (null for index tickers)."},
+            "vw": {"type": "array", "items": {"type": ["number", "null"]}, "description": "Volume weighted average prices."},
+            "t": {"type": "array", "items": {"type": "integer"}, "description": "Unix Msec timestamps."},
+            "n": {"type": "array", "items": {"type": ["integer", "null"]}, "description": "Numbers of transactions."},
+            "unavailable": {
+                "type": "object",
+                "description": "Error or 'no data' message for each requested ticker without a bar.",
+                "additionalProperties": {"type": "object"}
+            },
+            "error": {"type": "string", "description": "Error message if the call failed."}
+        }
+    }
+})
 
 # We can add other tool functions and definitions here later.
 # For example:
@@ -126,39 +365,40 @@ async def get_custom_bars(
     :param limit: Limits the number of base aggregates queried. Max 50000.
     :return: A dictionary containing the aggregate bar data or an error message.
     """
-    if not POLYGON_API_KEY:
-        return {"error": "Polygon API key is not configured."}
-
-    url = f"{BASE_URL}/v2/aggs/ticker/{ticker}/range/{multiplier}/{timespan}/{from_date}/{to_date}"
+    ticker = _normalize_ticker(ticker)
+    invalid = _validate(ticker, from_date, to_date, date_re=_RANGE_BOUND_RE)
+    if invalid is not None:
+        return invalid
+    path = _CUSTOM_BARS_PATH.format(
+        ticker=ticker, multiplier=multiplier, timespan=timespan, from_date=from_date, to_date=to_date
+    )
     params = {
-        "adjusted": str(adjusted).lower(),
+        "adjusted": _ADJUSTED_STR[adjusted],
         "sort": sort,
-        "limit": str(limit),
-        "apiKey": POLYGON_API_KEY
+        "limit": str(limit)
     }
 
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-
-            # Custom bars response structure:
-            # {"ticker":"AAPL","queryCount":2,"resultsCount":2,"adjusted":true,"results":[{"v":123,"vw":150,"o":150,"c":150,"h":150,"l":150,"t":1678886400000,"n":1}, ...],"status":"OK","request_id":"someid"}
-            if data.get("status") == "OK": # "results" might be empty if no data for range
-                return data # Return the full response including the list of bars
-            else:
-                return {"error": data.get("error") or data.get("message", "Failed to fetch data from Polygon API"), "details": data}
-
-        except httpx.HTTPStatusError as e:
-            return {"error": f"Polygon API error: {e.response.status_code}", "message": str(e.response.text)}
-        except httpx.RequestError as e:
-            return {"error": "Failed to connect to Polygon API", "message": str(e)}
-        except Exception as e:
-            print(f"Unexpected error in get_custom_bars: {e}")
-            return {"error": "An unexpected error occurred."}
+    try:
+        response = await get_with_retry(path, params)
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+
+        # Custom bars response structure:
+        # {"ticker":"AAPL","queryCount":2,"resultsCount":2,"adjusted":true,"results":[{"v":123,"vw":150,"o":150,"c":150,"h":150,"l":150,"t":1678886400000,"n":1}, ...],"status":"OK","request_id":"someid"}
+        if data.get("status") == "OK": # "results" might be empty if no data for range
+            return data # Return the full response including the list of bars
+        else:
+            return {"error": data.get("error") or data.get("message", "Failed to fetch data from Polygon API"), "details": data}
 
-CUSTOM_BARS_TOOL_DEF: Dict[str, Any] = {
+    except httpx.HTTPStatusError as e:
+        return {"error": f"Polygon API error: {e.response.status_code}", "message": e.response.text}
+    except httpx.RequestError as e:
+        return {"error": "Failed to connect to Polygon API", "message": str(e)}
+    except Exception:
+        logger.exception("Unexpected error in get_custom_bars")
+        return {"error": "An unexpected error occurred."}
+
+CUSTOM_BARS_TOOL_DEF: Mapping[str, Any] = MappingProxyType({
     "tool_name": "get_custom_bars",
     "description": "Retrieves custom aggregate bars for a stock ticker over a given date range.",
     "input_schema": {
@@ -204,7 +444,7 @@ CUSTOM_BARS_TOOL_DEF: Dict[str, Any] = {
             "message": {"type": "string", "description": "Additional message from API."}
         }
     }
-}
+})
 
 async def get_daily_market_summary(
     date: str,
@@ -220,39 +460,58 @@ async def get_daily_market_summary(
     :param include_otc: Whether to include OTC securities. Defaults to False.
     :return: A dictionary containing the market summary data or an error message.
     """
-    if not POLYGON_API_KEY:
-        return {"error": "Polygon API key is not configured."}
-
-    # Note: The API docs specify /v2/aggs/grouped/locale/us/market/stocks/{date}
-    # This implies it's for US stocks.
-    url = f"{BASE_URL}/v2/aggs/grouped/locale/us/market/stocks/{date}"
+    invalid = _validate(None, date)
+    if invalid is not None:
+        return invalid
+    cache_key = (date, _ADJUSTED_STR[adjusted], _INCLUDE_OTC_STR[include_otc])
+    return await _MARKET_SUMMARY_CACHE.get_or_fetch(
+        cache_key, _daily_ttl(date), _fetch_daily_market_summary, date, adjusted, include_otc
+    )
+
+async def _fetch_daily_market_summary(
+    date: str,
+    adjusted: Optional[bool],
+    include_otc: Optional[bool]
+) -> Dict[str, Any]:
+    """Fetches the grouped daily bars for get_daily_market_summary from Polygon, bypassing the cache."""
+    path = _DAILY_MARKET_SUMMARY_PATH.format(date=date)
     params = {
-        "adjusted": str(adjusted).lower(),
-        "includeOTC": str(include_otc).lower(), # API expects 'true' or 'false'
-        "apiKey": POLYGON_API_KEY
+        "adjusted": _ADJUSTED_STR[adjusted],
+        "includeOTC": _INCLUDE_OTC_STR[include_otc]
     }
 
-    async with httpx.AsyncClient() as client:
+    try:
+        # The grouped response carries a bar for every US ticker (several MB), so it
+        # is streamed into a single growing buffer rather than collected as chunks
+        # and then joined, which would hold two copies of the body at once.
+        response = await get_with_retry(path, params, stream=True)
         try:
-            response = await client.get(url, params=params)
+            if response.is_error:
+                await response.aread() # The error handler below reports the body
             response.raise_for_status()
-            data = response.json()
-            # Example Response:
-            # {"queryCount":100,"resultsCount":100,"adjusted":true,"results":[...],"status":"OK","request_id":"..."}
-            if data.get("status") == "OK":
-                return data # Return the full response
-            else:
-                return {"error": data.get("error") or data.get("message", "Failed to fetch data from Polygon API"), "details": data}
-
-        except httpx.HTTPStatusError as e:
-            return {"error": f"Polygon API error: {e.response.status_code}", "message": str(e.response.text)}
-        except httpx.RequestError as e:
-            return {"error": "Failed to connect to Polygon API", "message": str(e)}
-        except Exception as e:
-            print(f"Unexpected error in get_daily_market_summary: {e}")
-            return {"error": "An unexpected error occurred."}
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body.extend(chunk)
+        finally:
+            await response.aclose()
+        # The faster parser matters most here, and it reads the buffer without a copy.
+        data = orjson.loads(body)
+        # Example Response:
+        # {"queryCount":100,"resultsCount":100,"adjusted":true,"results":[...],"status":"OK","request_id":"..."}
+        if data.get("status") == "OK":
+            return data # Return the full response
+        else:
+            return {"error": data.get("error") or data.get("message", "Failed to fetch data from Polygon API"), "details": data}
+
+    except httpx.HTTPStatusError as e:
+        return {"error": f"Polygon API error: {e.response.status_code}", "message": e.response.text}
+    except httpx.RequestError as e:
+        return {"error": "Failed to connect to Polygon API", "message": str(e)}
+    except Exception:
+        logger.exception("Unexpected error in get_daily_market_summary")
+        return {"error": "An unexpected error occurred."}
 
-DAILY_MARKET_SUMMARY_TOOL_DEF: Dict[str, Any] = {
+DAILY_MARKET_SUMMARY_TOOL_DEF: Mapping[str, Any] = MappingProxyType({
     "tool_name": "get_daily_market_summary",
     "description": "Retrieves the daily OHLC summary for all US stock tickers for a given date.",
     "input_schema": {
@@ -293,7 +552,7 @@ DAILY_MARKET_SUMMARY_TOOL_DEF: Dict[str, Any] = {
             "message": {"type": "string", "description": "Additional message from API."}
         }
     }
-}
+})
 
 async def get_daily_ticker_summary(
     ticker: str,
@@ -309,43 +568,52 @@ async def get_daily_ticker_summary(
     :param adjusted: Whether results are adjusted for splits. Defaults to True.
     :return: A dictionary containing the ticker summary data or an error message.
     """
-    if not POLYGON_API_KEY:
-        return {"error": "Polygon API key is not configured."}
-
+    ticker = _normalize_ticker(ticker)
+    invalid = _validate(ticker, date)
+    if invalid is not None:
+        return invalid
+    cache_key = ("dts", ticker, date, _ADJUSTED_STR[adjusted])
+    return await _RESPONSE_CACHE.get_or_fetch(
+        cache_key, _daily_ttl(date), _fetch_daily_ticker_summary, ticker, date, adjusted
+    )
+
+async def _fetch_daily_ticker_summary(ticker: str, date: str, adjusted: Optional[bool]) -> Dict[str, Any]:
+    """Fetches the open/close summary for get_daily_ticker_summary from Polygon, bypassing the cache."""
     # This uses the v1 daily open/close endpoint
-    url = f"{BASE_URL}/v1/open-close/{ticker}/{date}"
+    path = _DAILY_TICKER_SUMMARY_PATH.format(ticker=ticker, date=date)
     params = {
-        "adjusted": str(adjusted).lower(),
-        "apiKey": POLYGON_API_KEY
+        "adjusted": _ADJUSTED_STR[adjusted]
     }
 
-    async with httpx.AsyncClient() as client:
+    try:
+        response = await get_with_retry(path, params)
+        # The body is parsed once and shared by the success and HTTP error paths;
+        # the v1 API usually explains 4xx/5xx responses in a JSON body.
         try:
-            response = await client.get(url, params=params)
-            data = response.json()
-            response.raise_for_status() # Check for 4xx/5xx HTTP errors first
-
-            # V1 API specific error handling (can return 200 OK with error in body)
-            if data.get("status") == "OK":
-                return data
-            elif data.get("status") == "ERROR" or "message" in data : # Check for API-level errors
-                 return {"error": data.get("message", "Failed to fetch data from Polygon API"), "details": data}
-            else: # Fallback for unexpected response structure
-                return {"error": "Failed to fetch data from Polygon API or unexpected response format", "details": data}
-
-        except httpx.HTTPStatusError as e:
-            try: # Try to parse JSON error from response body
-                error_data = e.response.json()
-                return {"error": f"Polygon API error: {e.response.status_code}", "message": error_data.get("message", str(e.response.text)), "details": error_data}
-            except: # If response body isn't JSON or other parsing error
-                return {"error": f"Polygon API error: {e.response.status_code}", "message": str(e.response.text)}
-        except httpx.RequestError as e:
-            return {"error": "Failed to connect to Polygon API", "message": str(e)}
-        except Exception as e:
-            print(f"Unexpected error in get_daily_ticker_summary: {e}")
-            return {"error": "An unexpected error occurred."}
-
-DAILY_TICKER_SUMMARY_TOOL_DEF: Dict[str, Any] = {
+            data = orjson.loads(response.content)
+        except orjson.JSONDecodeError:
+            data = None
+
+        if response.is_error: # 4xx/5xx HTTP errors
+            if isinstance(data, dict):
+                return {"error": f"Polygon API error: {response.status_code}", "message": data.get("message", response.text), "details": data}
+            return {"error": f"Polygon API error: {response.status_code}", "message": response.text}
+
+        # V1 API specific error handling (can return 200 OK with error in body)
+        if data.get("status") == "OK":
+            return data
+        elif data.get("status") == "ERROR" or "message" in data : # Check for API-level errors
+             return {"error": data.get("message", "Failed to fetch data from Polygon API"), "details": data}
+        else: # Fallback for unexpected response structure
+            return {"error": "Failed to fetch data from Polygon API or unexpected response format", "details": data}
+
+    except httpx.RequestError as e:
+        return {"error": "Failed to connect to Polygon API", "message": str(e)}
+    except Exception:
+        logger.exception("Unexpected error in get_daily_ticker_summary")
+        return {"error": "An unexpected error occurred."}
+
+DAILY_TICKER_SUMMARY_TOOL_DEF: Mapping[str, Any] = MappingProxyType({
     "tool_name": "get_daily_ticker_summary",
     "description": "Retrieves the daily OHLC, volume, and after-hours/pre-market data for a specific ticker on a given date (Polygon v1 API).",
     "input_schema": {
@@ -375,61 +643,138 @@ DAILY_TICKER_SUMMARY_TOOL_DEF: Dict[str, Any] = {
             "details": {"type": "object", "description": "Full error details if available."}
         }
     }
-}
+})
+
+async def get_daily_ticker_summaries(
+    tickers: List[str],
+    date: str,
+    adjusted: Optional[bool] = True
+) -> Dict[str, Any]:
+    """
+    Retrieves the daily OHLC data for several stock tickers on a given date.
+
+    Rather than one open/close request per ticker, this fetches the grouped
+    daily bars for the whole US market on that date (a single, cached request)
+    and filters it down to the requested tickers.
+
+    :param tickers: The stock ticker symbols (e.g., ["AAPL", "MSFT"]).
+    :param date: The date for the summaries (YYYY-MM-DD).
+    :param adjusted: Whether results are adjusted for splits. Defaults to True.
+    :return: A dictionary with the date, the tickers that have a bar, one list
+             per bar field aligned with those tickers, and a message for each
+             ticker without a bar.
+    """
+    tickers = list(dict.fromkeys(map(_normalize_ticker, tickers))) # De-duplicate, keeping the caller's order
+    if not tickers:
+        return {"error": "At least one ticker is required."}
+
+    summary = await get_daily_market_summary(date, adjusted)
+    if "error" in summary:
+        return {"error": summary["error"], "date": date, "details": summary}
+
+    wanted = set(tickers)
+    results: Dict[str, Dict[str, Any]] = {
+        bar["T"]: bar for bar in summary.get("results") or [] if bar.get("T") in wanted
+    }
+    for ticker in tickers:
+        if ticker not in results:
+            results[ticker] = {"message": f"No daily bar found for {ticker} on {date}."}
+    return _bars_by_column(date, tickers, results)
+
+DAILY_TICKER_SUMMARIES_TOOL_DEF: Mapping[str, Any] = MappingProxyType({
+    "tool_name": "get_daily_ticker_summaries",
+    "description": "Retrieves the daily OHLC data for several US stock tickers on a given date in one call.",
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "tickers": {"type": "array", "items": {"type": "string"}, "description": "The stock ticker symbols (e.g., ['AAPL', 'MSFT'])."},
+            "date": {"type": "string", "description": "The date for the summaries (YYYY-MM-DD)."},
+            "adjusted": {"type": "boolean", "description": "Whether results are adjusted for splits. Defaults to true.", "default": True}
+        },
+        "required": ["tickers", "date"]
+    },
+    "output_schema": {
+        "type": "object",
+        "properties": {
+            "date": {"type": "string", "description": "The requested date (YYYY-MM-DD)."},
+            "tickers": {"type": "array", "items": {"type": "string"}, "description": "Tickers with a bar; every field list below is aligned with this list."},
+            "o": {"type": "array", "items": {"type": "number"}, "description": "Open prices."},
+            "h": {"type": "array", "items": {"type": "number"}, "description": "High prices."},
+            "l": {"type": "array", "items": {"type": "number"}, "description": "Low prices."},
+            "c": {"type": "array", "items": {"type": "number"}, "description": "Close prices."},
+            "v": {"type": "array", "items": {"type": ["number", "null"]}, "description": "Trading volumes (null for index tickers)."},
+            "vw": {"type": "array", "items": {"type": ["number", "null"]}, "description": "Volume weighted average prices."},
+            "t": {"type": "array", "items": {"type": "integer"}, "description": "Unix Msec timestamps."},
+            "n": {"type": "array", "items": {"type": ["integer", "null"]}, "description": "Numbers of transactions."},
+            "unavailable": {
+                "type": "object",
+                "description": "'No data' message for each requested ticker without a bar.",
+                "additionalProperties": {"type": "object"}
+            },
+            "error": {"type": "string", "description": "Error message if the call failed."},
+            "details": {"type": "object", "description": "Full error details if available."}
+        }
+    }
+})
 
-# A list to easily export all tool definitions from this module
-ALL_TOOL_DEFS: List[Dict[str, Any]] = [
+# A tuple to easily export all tool definitions from this module. The definitions
+# are only read (never mutated), so they are frozen to catch accidental writes.
+ALL_TOOL_DEFS: Tuple[Mapping[str, Any], ...] = (
     PREVIOUS_DAY_BAR_TOOL_DEF,
+    PREVIOUS_DAY_BARS_TOOL_DEF,
     CUSTOM_BARS_TOOL_DEF,
     DAILY_MARKET_SUMMARY_TOOL_DEF,
-    DAILY_TICKER_SUMMARY_TOOL_DEF
-]
+    DAILY_TICKER_SUMMARY_TOOL_DEF,
+    DAILY_TICKER_SUMMARIES_TOOL_DEF
+)
 
-# A dictionary to map tool names to their handler functions
-TOOL_HANDLERS = {
+# A read-only mapping of tool names to their handler functions
+TOOL_HANDLERS: Mapping[str, Callable[..., Awaitable[Dict[str, Any]]]] = MappingProxyType({
     "get_previous_day_bar": get_previous_day_bar,
+    "get_previous_day_bars": get_previous_day_bars,
     "get_custom_bars": get_custom_bars,
     "get_daily_market_summary": get_daily_market_summary,
     "get_daily_ticker_summary": get_daily_ticker_summary,
-}
-
-# For FastMCP integration
-from mcp.server.fastmcp import FastMCP # Ensure FastMCP is imported if not already
-import logging # For logging within the registration function
-
-logger = logging.getLogger(__name__)
+    "get_daily_ticker_summaries": get_daily_ticker_summaries,
+})
+
+# Tool name, description and handler for every OHLCV tool, resolved once at import
+# so that registration is a straight iteration over ready objects. A definition
+# without a matching handler fails here, at import, rather than at registration.
+REGISTRATION_PLAN: Tuple[Tuple[str, str, Callable[..., Awaitable[Dict[str, Any]]]], ...] = tuple(
+    (
+        tool_def["tool_name"],
+        tool_def.get("description", TOOL_HANDLERS[tool_def["tool_name"]].__doc__ or ""),
+        TOOL_HANDLERS[tool_def["tool_name"]],
+    )
+    for tool_def in ALL_TOOL_DEFS
+)
+
+def register_tools(mcp_instance: FastMCP) -> int:
+    """
+    Registers all OHLCV tools with the provided FastMCP instance.
 
-def register_tools(mcp_instance: FastMCP):
-    """Registers all OHLCV tools with the provided FastMCP instance."""
+    :return: The number of tools that were registered.
+    """
     registered_count = 0
-    for tool_def_info in ALL_TOOL_DEFS:
-        tool_name = tool_def_info.get("tool_name")
-        handler_func = TOOL_HANDLERS.get(tool_name)
-
-        if not tool_name:
-            logger.warning("Found an OHLCV tool definition without a 'tool_name' in ohlcv_tools. Skipping.")
-            continue
-        if not handler_func:
-            logger.warning(f"No handler function found for OHLCV tool '{tool_name}' in ohlcv_tools. Skipping.")
-            continue
-
+    for tool_name, description, handler_func in REGISTRATION_PLAN:
         try:
-            description = tool_def_info.get("description", handler_func.__doc__ or "")
             # FastMCP infers input_schema and output_schema from type hints and docstrings.
             # The explicit schemas in TOOL_DEF are for documentation/alternative registration.
             mcp_instance.tool(
                 name=tool_name,
                 description=description
             )(handler_func)
-            logger.info(f"OHLCV Tool '{tool_name}' registered successfully via ohlcv_tools.register_tools.")
+            logger.info("OHLCV Tool '%s' registered successfully via ohlcv_tools.register_tools.", tool_name)
             registered_count += 1
         except Exception as e:
-            logger.error(f"Failed to register OHLCV tool '{tool_name}' via ohlcv_tools.register_tools: {e}", exc_info=True)
+            logger.error("Failed to register OHLCV tool '%s' via ohlcv_tools.register_tools: %s", tool_name, e, exc_info=True)
     
     if registered_count == 0:
         logger.warning("No OHLCV tools were successfully registered by ohlcv_tools.register_tools.")
     else:
-        logger.info(f"Successfully registered {registered_count} OHLCV tool(s) via ohlcv_tools.register_tools.")
+        logger.info("Successfully registered %d OHLCV tool(s) via ohlcv_tools.register_tools.", registered_count)
+    return registered_count
 
 
 if __name__ == '__main__':
@@ -494,8 +839,13 @@ if __name__ == '__main__':
         result_invalid_daily_summary = await get_daily_ticker_summary(ticker="INVALIDTICKERXYZ", date="2023-01-09")
         print(f"INVALIDTICKERXYZ Daily Ticker Summary (2023-01-09) Result: {result_invalid_daily_summary}\n")
 
+        await aclose()
+
 
     if os.name == 'nt': # Fix for "RuntimeError: Event loop is closed" on Windows
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-
-    asyncio.run(main_test())
+        asyncio.run(main_test())
+    else:
+        # Run on the same libuv-backed loop as the server (see server.py).
+        import uvloop
+        asyncio.run(main_test(), loop_factory=uvloop.new_event_loop)
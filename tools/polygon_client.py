@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import random
+from typing import Any, Mapping, Optional
+
+import httpx
+
+from config import POLYGON_API_KEY
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = "https://api.polygon.io"
+
+# Polygon expects booleans as 'true'/'false'; a lookup avoids str(...).lower() per call.
+BOOL_STR = {True: "true", False: "false"}
+
+# A single client shared by every tool so that connections (and TLS sessions)
+# to api.polygon.io are pooled and reused across calls instead of paying a new
+# TCP + TLS handshake per request.
+_CLIENT: Optional[httpx.AsyncClient] = None
+
+def get_client() -> httpx.AsyncClient:
+    """Returns the shared Polygon API client, creating it on first use."""
+    global _CLIENT
+    if _CLIENT is None or _CLIENT.is_closed:
+        _CLIENT = httpx.AsyncClient(
+            base_url=BASE_URL,
+            http2=True,
+            # Accept-Encoding is left to httpx: with the brotli extra installed it
+            # offers "br" alongside gzip, which shrinks large JSON bodies such as the
+            # grouped daily bars further. Forcing the header would break decoding
+            # wherever brotli is missing.
+            # Polygon accepts the API key as a bearer token, which keeps it out of request URLs.
+            headers={"Authorization": f"Bearer {POLYGON_API_KEY}"},
+            # With HTTP/2 many concurrent requests are multiplexed as streams over a
+            # single connection, so a small pool is enough even for bursts of calls.
+            limits=httpx.Limits(max_connections=8, max_keepalive_connections=8, keepalive_expiry=30.0),
+            # Fail fast if api.polygon.io is unreachable, but allow large responses time to arrive.
+            timeout=httpx.Timeout(10.0, connect=5.0)
+        )
+    return _CLIENT
+
+async def warm_up() -> None:
+    """
+    Opens a pooled connection to Polygon (DNS lookup, TCP and TLS handshakes)
+    ahead of the first tool call, so that call doesn't pay for it. Failures are
+    only logged; the first real request simply connects as usual.
+    """
+    try:
+        await get_client().head("/v1/marketstatus/now")
+    except httpx.HTTPError as e:
+        logger.debug("Polygon connection warm-up failed: %s", e)
+
+async def aclose() -> None:
+    """Closes the shared client, if one was created. Called on server shutdown."""
+    global _CLIENT
+    # Detached first, so a session starting while this awaits gets a fresh client.
+    client, _CLIENT = _CLIENT, None
+    if client is not None:
+        await client.aclose()
+
+# Rate limiting (429) and transient server-side failures are worth another try;
+# any other status is returned to the caller as is.
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Cap on any single wait, including a server-provided Retry-After, so that a tool
+# call never stalls for minutes.
+_MAX_RETRY_DELAY = 30.0
+# Random extra wait added to every retry. Requests throttled together (e.g. a bulk
+# tool's fan-out hitting one 429) would otherwise all come back at the same moment
+# and be throttled again.
+_RETRY_JITTER = 0.25
+
+def _backoff_delay(attempt: int) -> float:
+    """Exponential backoff with jitter, so that concurrent retries don't line up."""
+    return min(_MAX_RETRY_DELAY, 0.25 * 2 ** attempt) + random.random() * _RETRY_JITTER
+
+def _retry_after_delay(response: httpx.Response, attempt: int) -> float:
+    """Returns how long to wait before retrying response, honouring Retry-After (in seconds) when present."""
+    try:
+        delay = min(_MAX_RETRY_DELAY, float(response.headers["Retry-After"]))
+    except (KeyError, ValueError):
+        # Missing, or given as an HTTP date; fall back to doubling from one second.
+        delay = min(_MAX_RETRY_DELAY, 2.0 ** attempt)
+    return delay + random.random() * _RETRY_JITTER
+
+async def get_with_retry(
+    path: str,
+    params: Optional[Mapping[str, Any]] = None,
+    max_retries: int = 4,
+    stream: bool = False
+) -> httpx.Response:
+    """
+    Sends a GET request for path with the shared client, retrying connection
+    errors, 429 and 5xx responses with exponential backoff.
+
+    :param path: The request path, relative to BASE_URL.
+    :param params: Query parameters for the request.
+    :param max_retries: How many times to retry before giving up.
+    :param stream: Return the final response without reading its body. The
+                   caller must then read it and close the response.
+    :return: The final response. Its status is not checked, so callers still
+             call raise_for_status() as before.
+    """
+    client = get_client()
+    attempt = 0
+    while True:
+        try:
+            response = await client.send(client.build_request("GET", path, params=params), stream=stream)
+        except httpx.RequestError:
+            if attempt >= max_retries:
+                raise
+            delay = _backoff_delay(attempt)
+        else:
+            if response.status_code not in _RETRY_STATUSES or attempt >= max_retries:
+                return response
+            if stream:
+                await response.aclose()
+            if response.status_code == 429:
+                delay = _retry_after_delay(response, attempt)
+            else:
+                delay = _backoff_delay(attempt)
+        await asyncio.sleep(delay)
+        attempt += 1
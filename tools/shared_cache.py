@@ -0,0 +1,84 @@
+import hashlib
+import logging
+from typing import Any, Dict, Mapping, Optional, Tuple
+from urllib.parse import urlencode
+
+import orjson
+
+from config import REDIS_URL
+
+logger = logging.getLogger(__name__)
+
+# Redis is an optional dependency (the "redis" extra); without it, or without
+# REDIS_URL, every function here is a no-op and only the in-process caches are used.
+try:
+    import redis.asyncio as redis
+except ImportError:
+    redis = None
+
+if REDIS_URL and redis is None:
+    logger.warning("REDIS_URL is set but the redis package is not installed; the shared cache is disabled.")
+
+# A second cache level behind each server's in-process LRU cache. Replicas behind
+# a load balancer share it, so a result fetched by one replica spares the others
+# the Polygon request.
+_REDIS: Optional["redis.Redis"] = None
+
+def _get_redis() -> Optional["redis.Redis"]:
+    """Returns the shared Redis client (and its connection pool), creating it on first use."""
+    global _REDIS
+    if _REDIS is None and REDIS_URL and redis is not None:
+        # Short timeouts, so an unreachable Redis costs a cache miss rather than a
+        # stalled tool call.
+        _REDIS = redis.from_url(REDIS_URL, socket_connect_timeout=0.5, socket_timeout=0.5)
+    return _REDIS
+
+def make_key(prefix: str, path: str, params: Mapping[str, Any]) -> str:
+    """Builds a fixed-length Redis key for a request from its path and query parameters."""
+    query = urlencode(sorted(params.items()))
+    return prefix + hashlib.blake2b((path + "?" + query).encode(), digest_size=16).hexdigest()
+
+async def get_json(key: str) -> Optional[Tuple[Dict[str, Any], Optional[float]]]:
+    """
+    Returns the result stored under key with the seconds it has left (None if it
+    never expires), or None on a miss, when disabled, or if Redis fails or holds a
+    corrupt value.
+    """
+    client = _get_redis()
+    if client is None:
+        return None
+    try:
+        # One round trip for both the value and how long Redis will keep it.
+        async with client.pipeline(transaction=False) as pipe:
+            raw, pttl = await pipe.get(key).pttl(key).execute()
+    except redis.RedisError as e:
+        logger.warning("Shared cache read failed: %s", e)
+        return None
+    if raw is None:
+        return None
+    try:
+        value = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        logger.warning("Ignoring a corrupt shared cache entry for %s", key)
+        return None
+    # PTTL is -1 for a key without an expiry, and -2 if it expired since the GET.
+    if pttl == -2:
+        return None
+    return value, (pttl / 1000 if pttl >= 0 else None)
+
+async def set_json(key: str, value: Dict[str, Any], ttl: float) -> None:
+    """Stores value under key for ttl seconds. Failures are logged and otherwise ignored."""
+    client = _get_redis()
+    if client is None or ttl <= 0:
+        return
+    try:
+        await client.set(key, orjson.dumps(value), px=int(ttl * 1000))
+    except redis.RedisError as e:
+        logger.warning("Shared cache write failed: %s", e)
+
+async def aclose() -> None:
+    """Closes the shared Redis client, if one was created. Called on server shutdown."""
+    global _REDIS
+    client, _REDIS = _REDIS, None
+    if client is not None:
+        await client.aclose()
@@ -1,17 +1,211 @@
+import asyncio
+import logging
+from types import MappingProxyType
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
 import httpx
-import os
-from typing import Optional, List, Dict, Any
+import msgspec
+import orjson
 from mcp.server.fastmcp import FastMCP
-import logging
 
-# Module-level logger, used by the registration function.
+from config import (
+    POLYGON_API_KEY,
+    POLYGON_CACHE_TTL,
+    POLYGON_LRU_MAXSIZE,
+    POLYGON_MAX_CONCURRENCY,
+)
+from tools import shared_cache
+from tools.cache import LRUCache
+from tools.polygon_client import BOOL_STR, get_with_retry
+
+# Module-level logger, used by the request helper and the registration function.
 logger = logging.getLogger(__name__)
 
-POLYGON_API_KEY = os.environ.get("POLYGON_API_KEY")
-BASE_URL = "https://api.polygon.io"
+# Endpoint path prefix for each indicator, relative to the shared client's base URL;
+# only the ticker is appended per request.
+_INDICATOR_PATHS = {
+    "sma": "/v1/indicators/sma/",
+    "ema": "/v1/indicators/ema/",
+    "macd": "/v1/indicators/macd/",
+    "rsi": "/v1/indicators/rsi/",
+}
+
+# Successful indicator responses are cached in process, so an agent asking for the
+# same indicator again (as it often does across reasoning steps) gets it without a
+# round trip. The latest value of a series moves as its current bar fills in, so
+# entries expire sooner the shorter the timespan.
+_INDICATOR_CACHE = LRUCache(maxsize=POLYGON_LRU_MAXSIZE)
+# Daily and longer timespans use POLYGON_CACHE_TTL (see config.py).
+_INDICATOR_TTL = {"minute": min(60.0, POLYGON_CACHE_TTL), "hour": min(300.0, POLYGON_CACHE_TTL)}
+
+# Caps concurrent indicator requests (e.g. from get_indicators_bundle, or an agent
+# fanning out over many tickers) so they complete on the first try instead of
+# being rejected with 429s and retried.
+_REQUEST_SEMAPHORE = asyncio.Semaphore(POLYGON_MAX_CONCURRENCY)
+
+class _IndicatorValue(msgspec.Struct, omit_defaults=True):
+    """A single indicator value; signal and histogram are only set for MACD."""
+    timestamp: int
+    value: float
+    signal: Optional[float] = None
+    histogram: Optional[float] = None
+
+class _Underlying(msgspec.Struct, omit_defaults=True):
+    """The underlying aggregates, present if expand_underlying is true."""
+    url: Optional[str] = None
+    aggregates: List[Dict[str, Any]] = []
+
+class _IndicatorResults(msgspec.Struct, omit_defaults=True):
+    """The results object: the indicator values and, optionally, their underlying aggregates."""
+    values: List[_IndicatorValue] = []
+    underlying: Optional[_Underlying] = None
+
+class _IndicatorResponse(msgspec.Struct, omit_defaults=True):
+    """The fields of an indicator response that the tools return (see the TOOL_DEF output schemas)."""
+    status: str
+    request_id: Optional[str] = None
+    results: Optional[_IndicatorResults] = None
+    next_url: Optional[str] = None
+
+# Parses and validates an indicator response in one pass, dropping fields that
+# aren't part of the tool output, so less of the body is decoded and sent back.
+_INDICATOR_RESPONSE_DECODER = msgspec.json.Decoder(_IndicatorResponse)
 
 # --- Tool Implementations ---
 
+class _IndicatorQuery(NamedTuple):
+    """
+    The arguments shared by every indicator tool, as the caller passed them. Being
+    a tuple, it is hashed directly as part of the cache key, so a cache hit never
+    builds the query parameters.
+    """
+    timestamp: Optional[str]
+    timestamp_gte: Optional[str]
+    timestamp_gt: Optional[str]
+    timestamp_lte: Optional[str]
+    timestamp_lt: Optional[str]
+    timespan: Optional[str]
+    adjusted: Optional[bool]
+    series_type: Optional[str]
+    expand_underlying: Optional[bool]
+    order: Optional[str]
+    limit: Optional[int]
+
+def _indicator_params(query: _IndicatorQuery, windows: Mapping[str, Optional[int]]) -> Dict[str, Any]:
+    """
+    Builds the query parameters for an indicator request under Polygon's names.
+    Arguments that are None are never inserted, so Polygon applies its defaults
+    for them; the window sizes are keyed by name (e.g. {"window": 50}).
+    """
+    params: Dict[str, Any] = {}
+    if query.timestamp is not None:
+        params["timestamp"] = query.timestamp
+    if query.timestamp_gte is not None:
+        params["timestamp.gte"] = query.timestamp_gte
+    if query.timestamp_gt is not None:
+        params["timestamp.gt"] = query.timestamp_gt
+    if query.timestamp_lte is not None:
+        params["timestamp.lte"] = query.timestamp_lte
+    if query.timestamp_lt is not None:
+        params["timestamp.lt"] = query.timestamp_lt
+    if query.timespan is not None:
+        params["timespan"] = query.timespan
+    if query.adjusted is not None:
+        params["adjusted"] = BOOL_STR[query.adjusted]
+    for name, size in windows.items():
+        if size is not None:
+            params[name] = size
+    if query.series_type is not None:
+        params["series_type"] = query.series_type
+    if query.expand_underlying is not None:
+        params["expand_underlying"] = BOOL_STR[query.expand_underlying]
+    if query.order is not None:
+        params["order"] = query.order
+    if query.limit is not None:
+        params["limit"] = query.limit
+    return params
+
+async def _fetch_indicator(indicator: str, ticker: str, query: _IndicatorQuery, **windows: Optional[int]) -> Dict[str, Any]:
+    """
+    Fetches a technical indicator for a stock ticker from Polygon. Shared by all
+    indicator tools, which differ only in the indicator and its window parameters.
+
+    :param indicator: The indicator's path segment (e.g. "sma").
+    :param ticker: The stock ticker symbol (e.g., "AAPL").
+    :param query: The tool's arguments other than the ticker and window sizes.
+    :param windows: The indicator's window sizes, by Polygon parameter name.
+    :return: Polygon's response, or an error message.
+    """
+    # Each tool passes its windows in a fixed order, so their values identify them.
+    cache_key = (indicator, ticker, query, tuple(windows.values()))
+    ttl = _INDICATOR_TTL.get(query.timespan, POLYGON_CACHE_TTL)
+    return await _INDICATOR_CACHE.get_or_fetch(
+        cache_key, ttl, _load_indicator, cache_key, indicator, ticker, query, windows, ttl
+    )
+
+async def _load_indicator(
+    cache_key: Hashable,
+    indicator: str,
+    ticker: str,
+    query: _IndicatorQuery,
+    windows: Mapping[str, Optional[int]],
+    ttl: float
+) -> Dict[str, Any]:
+    """
+    Handles an in-process cache miss for _fetch_indicator: builds the query
+    parameters, then tries the shared Redis cache (when REDIS_URL is set) before
+    requesting the indicator from Polygon.
+    """
+    params = _indicator_params(query, windows)
+    shared_key = shared_cache.make_key("polyind:", _INDICATOR_PATHS[indicator] + ticker, params)
+    shared = await shared_cache.get_json(shared_key)
+    if shared is not None:
+        data, remaining = shared
+        # The Redis entry may be close to expiring, so the in-process copy only lives
+        # as long as it has left; otherwise a hit could be served up to twice the TTL.
+        _INDICATOR_CACHE.set(cache_key, data, ttl if remaining is None else min(ttl, remaining))
+        return data
+    data = await _request_indicator(indicator, ticker, params)
+    if "error" not in data:
+        await shared_cache.set_json(shared_key, data, ttl)
+    return data
+
+async def _request_indicator(indicator: str, ticker: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Requests an indicator for _fetch_indicator from Polygon, bypassing the cache."""
+    path = _INDICATOR_PATHS[indicator] + ticker
+
+    try:
+        async with _REQUEST_SEMAPHORE:
+            response = await get_with_retry(path, params)
+        response.raise_for_status()
+        # Indicator responses (especially with expand_underlying) can be large; msgspec
+        # decodes the raw bytes straight into the typed response, skipping unused keys.
+        resp = _INDICATOR_RESPONSE_DECODER.decode(response.content)
+        if resp.status == "OK":
+            return msgspec.to_builtins(resp)
+        else:
+            # Non-OK statuses are rare, so parse the full body for the details.
+            data = orjson.loads(response.content)
+            return {"error": data.get("error", f"Failed to fetch {indicator.upper()} data from Polygon API"), "details": data}
+    except httpx.HTTPStatusError as e:
+        return {"error": f"Polygon API error: {e.response.status_code}", "message": str(e.response.text)}
+    except httpx.RequestError as e:
+        return {"error": "Failed to connect to Polygon API", "message": str(e)}
+    except Exception:
+        logger.exception("Unexpected error in get_%s for %s", indicator, ticker)
+        return {"error": "An unexpected error occurred."}
+
 async def get_sma(
     ticker: str,
     timestamp: Optional[str] = None,
@@ -32,35 +226,10 @@ async def get_sma(
     SMA is a technical indicator that calculates the average of a selected range of prices,
     usually closing prices, by the number of periods in that range.
     """
-    if not POLYGON_API_KEY:
-        return {"error": "Polygon API key is not configured."}
-
-    path = f"/v1/indicators/sma/{ticker}"
-    params = {
-        "timestamp": timestamp, "timestamp.gte": timestamp_gte, "timestamp.gt": timestamp_gt,
-        "timestamp.lte": timestamp_lte, "timestamp.lt": timestamp_lt, "timespan": timespan,
-        "adjusted": str(adjusted).lower(), "window": window, "series_type": series_type,
-        "expand_underlying": str(expand_underlying).lower(), "order": order, "limit": limit,
-        "apiKey": POLYGON_API_KEY
-    }
-    params = {k: v for k, v in params.items() if v is not None}
-    
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(f"{BASE_URL}{path}", params=params)
-            response.raise_for_status()
-            data = response.json()
-            if data.get("status") == "OK":
-                return data 
-            else:
-                return {"error": data.get("error", "Failed to fetch SMA data from Polygon API"), "details": data}
-        except httpx.HTTPStatusError as e:
-            return {"error": f"Polygon API error: {e.response.status_code}", "message": str(e.response.text)}
-        except httpx.RequestError as e:
-            return {"error": "Failed to connect to Polygon API", "message": str(e)}
-        except Exception as e:
-            print(f"Unexpected error in get_sma for {ticker}: {e}") 
-            return {"error": "An unexpected error occurred."}
+    return await _fetch_indicator("sma", ticker, _IndicatorQuery(
+        timestamp, timestamp_gte, timestamp_gt, timestamp_lte, timestamp_lt, timespan,
+        adjusted, series_type, expand_underlying, order, limit
+    ), window=window)
 
 async def get_ema(
     ticker: str,
@@ -81,33 +250,10 @@ async def get_ema(
     Get Exponential Moving Average (EMA) data for a stock ticker.
     EMA is a type of moving average that places a greater weight and significance on the most recent data points.
     """
-    if not POLYGON_API_KEY:
-        return {"error": "Polygon API key is not configured."}
-    path = f"/v1/indicators/ema/{ticker}"
-    params = {
-        "timestamp": timestamp, "timestamp.gte": timestamp_gte, "timestamp.gt": timestamp_gt,
-        "timestamp.lte": timestamp_lte, "timestamp.lt": timestamp_lt, "timespan": timespan,
-        "adjusted": str(adjusted).lower(), "window": window, "series_type": series_type,
-        "expand_underlying": str(expand_underlying).lower(), "order": order, "limit": limit,
-        "apiKey": POLYGON_API_KEY
-    }
-    params = {k: v for k, v in params.items() if v is not None}
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(f"{BASE_URL}{path}", params=params)
-            response.raise_for_status()
-            data = response.json()
-            if data.get("status") == "OK":
-                return data
-            else:
-                return {"error": data.get("error", "Failed to fetch EMA data from Polygon API"), "details": data}
-        except httpx.HTTPStatusError as e:
-            return {"error": f"Polygon API error: {e.response.status_code}", "message": str(e.response.text)}
-        except httpx.RequestError as e:
-            return {"error": "Failed to connect to Polygon API", "message": str(e)}
-        except Exception as e:
-            print(f"Unexpected error in get_ema for {ticker}: {e}")
-            return {"error": "An unexpected error occurred."}
+    return await _fetch_indicator("ema", ticker, _IndicatorQuery(
+        timestamp, timestamp_gte, timestamp_gt, timestamp_lte, timestamp_lt, timespan,
+        adjusted, series_type, expand_underlying, order, limit
+    ), window=window)
 
 async def get_macd(
     ticker: str,
@@ -130,34 +276,10 @@ async def get_macd(
     Get Moving Average Convergence Divergence (MACD) data for a stock ticker.
     MACD is a trend-following momentum indicator that shows the relationship between two moving averages of a security’s price.
     """
-    if not POLYGON_API_KEY:
-        return {"error": "Polygon API key is not configured."}
-    path = f"/v1/indicators/macd/{ticker}"
-    params = {
-        "timestamp": timestamp, "timestamp.gte": timestamp_gte, "timestamp.gt": timestamp_gt,
-        "timestamp.lte": timestamp_lte, "timestamp.lt": timestamp_lt, "timespan": timespan,
-        "adjusted": str(adjusted).lower(), "short_window": short_window, "long_window": long_window,
-        "signal_window": signal_window, "series_type": series_type,
-        "expand_underlying": str(expand_underlying).lower(), "order": order, "limit": limit,
-        "apiKey": POLYGON_API_KEY
-    }
-    params = {k: v for k, v in params.items() if v is not None}
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(f"{BASE_URL}{path}", params=params)
-            response.raise_for_status()
-            data = response.json()
-            if data.get("status") == "OK":
-                return data
-            else:
-                return {"error": data.get("error", "Failed to fetch MACD data from Polygon API"), "details": data}
-        except httpx.HTTPStatusError as e:
-            return {"error": f"Polygon API error: {e.response.status_code}", "message": str(e.response.text)}
-        except httpx.RequestError as e:
-            return {"error": "Failed to connect to Polygon API", "message": str(e)}
-        except Exception as e:
-            print(f"Unexpected error in get_macd for {ticker}: {e}")
-            return {"error": "An unexpected error occurred."}
+    return await _fetch_indicator("macd", ticker, _IndicatorQuery(
+        timestamp, timestamp_gte, timestamp_gt, timestamp_lte, timestamp_lt, timespan,
+        adjusted, series_type, expand_underlying, order, limit
+    ), short_window=short_window, long_window=long_window, signal_window=signal_window)
 
 async def get_rsi(
     ticker: str,
@@ -178,37 +300,104 @@ async def get_rsi(
     Get Relative Strength Index (RSI) data for a stock ticker.
     RSI is a momentum oscillator that measures the speed and change of price movements.
     """
-    if not POLYGON_API_KEY:
-        return {"error": "Polygon API key is not configured."}
-    path = f"/v1/indicators/rsi/{ticker}"
-    params = {
-        "timestamp": timestamp, "timestamp.gte": timestamp_gte, "timestamp.gt": timestamp_gt,
-        "timestamp.lte": timestamp_lte, "timestamp.lt": timestamp_lt, "timespan": timespan,
-        "adjusted": str(adjusted).lower(), "window": window, "series_type": series_type,
-        "expand_underlying": str(expand_underlying).lower(), "order": order, "limit": limit,
-        "apiKey": POLYGON_API_KEY
-    }
-    params = {k: v for k, v in params.items() if v is not None}
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(f"{BASE_URL}{path}", params=params)
-            response.raise_for_status()
-            data = response.json()
-            if data.get("status") == "OK":
-                return data
-            else:
-                return {"error": data.get("error", "Failed to fetch RSI data from Polygon API"), "details": data}
-        except httpx.HTTPStatusError as e:
-            return {"error": f"Polygon API error: {e.response.status_code}", "message": str(e.response.text)}
-        except httpx.RequestError as e:
-            return {"error": "Failed to connect to Polygon API", "message": str(e)}
-        except Exception as e:
-            print(f"Unexpected error in get_rsi for {ticker}: {e}")
-            return {"error": "An unexpected error occurred."}
+    return await _fetch_indicator("rsi", ticker, _IndicatorQuery(
+        timestamp, timestamp_gte, timestamp_gt, timestamp_lte, timestamp_lt, timespan,
+        adjusted, series_type, expand_underlying, order, limit
+    ), window=window)
+
+async def get_indicators_bundle(
+    ticker: str,
+    indicators: Optional[List[str]] = None,
+    timestamp: Optional[str] = None,
+    timestamp_gte: Optional[str] = None,
+    timestamp_gt: Optional[str] = None,
+    timestamp_lte: Optional[str] = None,
+    timestamp_lt: Optional[str] = None,
+    timespan: Optional[str] = "day",
+    adjusted: Optional[bool] = True,
+    series_type: Optional[str] = "close",
+    expand_underlying: Optional[bool] = False,
+    order: Optional[str] = "desc",
+    limit: Optional[int] = 10
+) -> Dict[str, Any]:
+    """
+    Get several technical indicators (SMA, EMA, MACD, RSI) for a stock ticker in one call.
+    The indicators are fetched concurrently, each with its default window sizes, and
+    returned keyed by indicator name.
+    """
+    if indicators is None:
+        indicators = list(_INDICATORS)
+    indicators = list(dict.fromkeys(indicators)) # De-duplicate, keeping the caller's order
+    unknown = [name for name in indicators if name not in _INDICATORS]
+    if unknown:
+        return {"error": f"Unknown indicator(s): {', '.join(unknown)}. Expected any of: {', '.join(_INDICATORS)}."}
+
+    query = _IndicatorQuery(
+        timestamp, timestamp_gte, timestamp_gt, timestamp_lte, timestamp_lt, timespan,
+        adjusted, series_type, expand_underlying, order, limit
+    )
+    # Every request shares the pooled HTTP/2 connection, so the bundle takes about
+    # as long as its slowest indicator rather than the sum of all of them.
+    results = await _fetch_indicators([(name, ticker) for name in indicators], query)
+    return dict(zip(indicators, results))
+
+async def get_indicators_bulk(
+    indicator: str,
+    tickers: List[str],
+    timestamp: Optional[str] = None,
+    timestamp_gte: Optional[str] = None,
+    timestamp_gt: Optional[str] = None,
+    timestamp_lte: Optional[str] = None,
+    timestamp_lt: Optional[str] = None,
+    timespan: Optional[str] = "day",
+    adjusted: Optional[bool] = True,
+    series_type: Optional[str] = "close",
+    expand_underlying: Optional[bool] = False,
+    order: Optional[str] = "desc",
+    limit: Optional[int] = 10
+) -> Dict[str, Any]:
+    """
+    Get one technical indicator (SMA, EMA, MACD or RSI) for several stock tickers in one call.
+    The tickers are fetched concurrently, with the indicator's default window sizes, and
+    returned keyed by ticker.
+    """
+    if indicator not in _INDICATORS:
+        return {"error": f"Unknown indicator: {indicator}. Expected one of: {', '.join(_INDICATORS)}."}
+    tickers = list(dict.fromkeys(tickers)) # De-duplicate, keeping the caller's order
+    if not tickers:
+        return {"error": "At least one ticker is required."}
+
+    query = _IndicatorQuery(
+        timestamp, timestamp_gte, timestamp_gt, timestamp_lte, timestamp_lt, timespan,
+        adjusted, series_type, expand_underlying, order, limit
+    )
+    # The request semaphore keeps a long ticker list from flooding Polygon; the
+    # rest share the pooled HTTP/2 connection.
+    results = await _fetch_indicators([(indicator, ticker) for ticker in tickers], query)
+    return dict(zip(tickers, results))
+
+# Indicators available to get_indicators_bundle and get_indicators_bulk, by the
+# name callers use for them, with the default window sizes of their own tools.
+_INDICATORS: Mapping[str, Mapping[str, int]] = MappingProxyType({
+    "sma": {"window": 50},
+    "ema": {"window": 50},
+    "macd": {"short_window": 12, "long_window": 26, "signal_window": 9},
+    "rsi": {"window": 14},
+})
+
+async def _fetch_indicators(requests: List[Tuple[str, str]], query: _IndicatorQuery) -> List[Dict[str, Any]]:
+    """
+    Fetches (indicator, ticker) pairs concurrently, each with its indicator's default
+    window sizes, for get_indicators_bundle and get_indicators_bulk. Results are in
+    the order of requests.
+    """
+    return await asyncio.gather(*(
+        _fetch_indicator(indicator, ticker, query, **_INDICATORS[indicator]) for indicator, ticker in requests
+    ))
 
 # --- Tool Definitions ---
 
-_INDICATOR_COMMON_INPUT_PROPS = {
+_INDICATOR_COMMON_INPUT_PROPS: Mapping[str, Any] = MappingProxyType({
     "ticker": {"type": "string", "description": "The stock ticker symbol (e.g., 'AAPL')."},
     "timestamp": {"type": "string", "description": "Query by timestamp. Either a date with the format YYYY-MM-DD or a millisecond timestamp.", "optional": True},
     "timestamp_gte": {"type": "string", "description": "Timestamp greater than or equal to.", "optional": True},
@@ -221,18 +410,18 @@ _INDICATOR_COMMON_INPUT_PROPS = {
     "expand_underlying": {"type": "boolean", "default": False, "description": "Include underlying aggregate data."},
     "order": {"type": "string", "default": "desc", "enum": ["asc", "desc"], "description": "Order of results."},
     "limit": {"type": "integer", "default": 10, "description": "Limit the number of results (Max: 5000)."}
-}
+})
 
-_INDICATOR_VALUE_OUTPUT_SCHEMA = {
+_INDICATOR_VALUE_OUTPUT_SCHEMA: Mapping[str, Any] = MappingProxyType({
     "type": "object",
     "properties": {
         "timestamp": {"type": "integer", "description": "Unix Msec timestamp of the indicator value."},
         "value": {"type": "number", "description": "The calculated indicator value."}
     },
     "required": ["timestamp", "value"]
-}
+})
 
-_MACD_VALUE_OUTPUT_SCHEMA = {
+_MACD_VALUE_OUTPUT_SCHEMA: Mapping[str, Any] = MappingProxyType({
     "type": "object",
     "properties": {
         "timestamp": {"type": "integer", "description": "Unix Msec timestamp of the indicator value."},
@@ -241,37 +430,37 @@ _MACD_VALUE_OUTPUT_SCHEMA = {
         "histogram": {"type": "number", "description": "The histogram value (MACD - Signal)."}
     },
     "required": ["timestamp", "value", "signal", "histogram"]
-}
+})
+
+# Shared by the indicator and MACD results schemas.
+_UNDERLYING_OUTPUT_SCHEMA: Mapping[str, Any] = MappingProxyType({
+    "type": "object", "description": "Present if expand_underlying is true.",
+    "properties": { "url": {"type": "string"}, "aggregates": {"type": "array", "items": {"type": "object"}} }
+})
 
-_INDICATOR_RESULTS_OUTPUT_SCHEMA = {
+_INDICATOR_RESULTS_OUTPUT_SCHEMA: Mapping[str, Any] = MappingProxyType({
     "type": "object",
     "properties": {
         "values": { "type": "array", "items": _INDICATOR_VALUE_OUTPUT_SCHEMA },
-        "underlying": {
-            "type": "object", "description": "Present if expand_underlying is true.",
-            "properties": { "url": {"type": "string"}, "aggregates": {"type": "array", "items": {"type": "object"}} }
-        }
+        "underlying": _UNDERLYING_OUTPUT_SCHEMA
     }
-}
+})
 
-_MACD_RESULTS_OUTPUT_SCHEMA = {
+_MACD_RESULTS_OUTPUT_SCHEMA: Mapping[str, Any] = MappingProxyType({
     "type": "object",
     "properties": {
         "values": { "type": "array", "items": _MACD_VALUE_OUTPUT_SCHEMA },
-        "underlying": {
-            "type": "object", "description": "Present if expand_underlying is true.",
-            "properties": { "url": {"type": "string"}, "aggregates": {"type": "array", "items": {"type": "object"}} }
-        }
+        "underlying": _UNDERLYING_OUTPUT_SCHEMA
     }
-}
+})
 
-_INDICATOR_BASE_OUTPUT_SCHEMA_PROPERTIES = {
+_INDICATOR_BASE_OUTPUT_SCHEMA_PROPERTIES: Mapping[str, Any] = MappingProxyType({
     "status": {"type": "string"}, "request_id": {"type": "string"},
     "next_url": {"type": "string", "description": "URL for the next page of results, if applicable."},
     "error": {"type": "string", "description": "Error message if the call failed."}
-}
+})
 
-SMA_TOOL_DEF: Dict[str, Any] = {
+SMA_TOOL_DEF: Mapping[str, Any] = MappingProxyType({
     "tool_name": "get_sma", "description": get_sma.__doc__,
     "input_schema": {
         "type": "object",
@@ -279,9 +468,9 @@ SMA_TOOL_DEF: Dict[str, Any] = {
         "required": ["ticker"]
     },
     "output_schema": {"type": "object", "properties": {**_INDICATOR_BASE_OUTPUT_SCHEMA_PROPERTIES, "results": _INDICATOR_RESULTS_OUTPUT_SCHEMA}}
-}
+})
 
-EMA_TOOL_DEF: Dict[str, Any] = {
+EMA_TOOL_DEF: Mapping[str, Any] = MappingProxyType({
     "tool_name": "get_ema", "description": get_ema.__doc__,
     "input_schema": {
         "type": "object",
@@ -289,9 +478,9 @@ EMA_TOOL_DEF: Dict[str, Any] = {
         "required": ["ticker"]
     },
     "output_schema": {"type": "object", "properties": {**_INDICATOR_BASE_OUTPUT_SCHEMA_PROPERTIES, "results": _INDICATOR_RESULTS_OUTPUT_SCHEMA}}
-}
+})
 
-MACD_TOOL_DEF: Dict[str, Any] = {
+MACD_TOOL_DEF: Mapping[str, Any] = MappingProxyType({
     "tool_name": "get_macd", "description": get_macd.__doc__,
     "input_schema": {
         "type": "object",
@@ -304,9 +493,9 @@ MACD_TOOL_DEF: Dict[str, Any] = {
         "required": ["ticker"]
     },
     "output_schema": {"type": "object", "properties": {**_INDICATOR_BASE_OUTPUT_SCHEMA_PROPERTIES, "results": _MACD_RESULTS_OUTPUT_SCHEMA}}
-}
+})
 
-RSI_TOOL_DEF: Dict[str, Any] = {
+RSI_TOOL_DEF: Mapping[str, Any] = MappingProxyType({
     "tool_name": "get_rsi", "description": get_rsi.__doc__,
     "input_schema": { 
         "type": "object",
@@ -314,42 +503,98 @@ RSI_TOOL_DEF: Dict[str, Any] = {
         "required": ["ticker"]
     },
     "output_schema": {"type": "object", "properties": {**_INDICATOR_BASE_OUTPUT_SCHEMA_PROPERTIES, "results": _INDICATOR_RESULTS_OUTPUT_SCHEMA}}
-}
+})
+
+INDICATORS_BUNDLE_TOOL_DEF: Mapping[str, Any] = MappingProxyType({
+    "tool_name": "get_indicators_bundle", "description": get_indicators_bundle.__doc__,
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            **_INDICATOR_COMMON_INPUT_PROPS,
+            "indicators": {
+                "type": "array", "items": {"type": "string", "enum": ["sma", "ema", "macd", "rsi"]},
+                "description": "The indicators to fetch. Defaults to all of them.", "optional": True
+            }
+        },
+        "required": ["ticker"]
+    },
+    "output_schema": {
+        "type": "object",
+        "description": "One indicator response (as returned by get_sma etc.) per requested indicator.",
+        "properties": {"error": {"type": "string", "description": "Error message if the call failed."}},
+        "additionalProperties": {"type": "object", "properties": {**_INDICATOR_BASE_OUTPUT_SCHEMA_PROPERTIES, "results": {"type": "object"}}}
+    }
+})
+
+INDICATORS_BULK_TOOL_DEF: Mapping[str, Any] = MappingProxyType({
+    "tool_name": "get_indicators_bulk", "description": get_indicators_bulk.__doc__,
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            **{name: prop for name, prop in _INDICATOR_COMMON_INPUT_PROPS.items() if name != "ticker"},
+            "indicator": {"type": "string", "enum": ["sma", "ema", "macd", "rsi"], "description": "The indicator to fetch."},
+            "tickers": {"type": "array", "items": {"type": "string"}, "description": "The stock ticker symbols (e.g., ['AAPL', 'MSFT'])."}
+        },
+        "required": ["indicator", "tickers"]
+    },
+    "output_schema": {
+        "type": "object",
+        "description": "One indicator response (as returned by get_sma etc.) per requested ticker.",
+        "properties": {"error": {"type": "string", "description": "Error message if the call failed."}},
+        "additionalProperties": {"type": "object", "properties": {**_INDICATOR_BASE_OUTPUT_SCHEMA_PROPERTIES, "results": {"type": "object"}}}
+    }
+})
 
-ALL_INDICATOR_TOOL_DEFS: List[Dict[str, Any]] = [SMA_TOOL_DEF, EMA_TOOL_DEF, MACD_TOOL_DEF, RSI_TOOL_DEF]
+ALL_INDICATOR_TOOL_DEFS: Tuple[Mapping[str, Any], ...] = (
+    SMA_TOOL_DEF, EMA_TOOL_DEF, MACD_TOOL_DEF, RSI_TOOL_DEF,
+    INDICATORS_BUNDLE_TOOL_DEF, INDICATORS_BULK_TOOL_DEF
+)
 
-INDICATOR_TOOL_HANDLERS = {
+INDICATOR_TOOL_HANDLERS: Mapping[str, Callable[..., Awaitable[Dict[str, Any]]]] = MappingProxyType({
     "get_sma": get_sma, "get_ema": get_ema,
     "get_macd": get_macd, "get_rsi": get_rsi,
-}
+    "get_indicators_bundle": get_indicators_bundle,
+    "get_indicators_bulk": get_indicators_bulk,
+})
+
+# Tool name, description and handler for every indicator tool. Unlike the OHLCV
+# plan, a handler without a definition also fails the check below.
+INDICATOR_REGISTRATION_PLAN: Tuple[Tuple[str, str, Callable[..., Awaitable[Dict[str, Any]]]], ...] = tuple(
+    (tool_def["tool_name"], tool_def["description"], INDICATOR_TOOL_HANDLERS[tool_def["tool_name"]])
+    for tool_def in ALL_INDICATOR_TOOL_DEFS
+)
+assert {name for name, _, _ in INDICATOR_REGISTRATION_PLAN} == set(INDICATOR_TOOL_HANDLERS), \
+    "Every indicator tool needs exactly one definition and one handler."
 
 # --- Registration Function ---
-def register_tools(mcp_instance: FastMCP):
-    """Registers all technical indicator tools with the provided FastMCP instance."""
+def register_tools(mcp_instance: FastMCP) -> int:
+    """
+    Registers all technical indicator tools with the provided FastMCP instance.
+
+    Nothing is registered without POLYGON_API_KEY, since every call would fail.
+
+    :return: The number of tools that were registered.
+    """
+    if not POLYGON_API_KEY:
+        logger.error("POLYGON_API_KEY not set; skipping indicator tool registration.")
+        return 0
+
     registered_count = 0
-    for tool_def_info in ALL_INDICATOR_TOOL_DEFS:
-        tool_name = tool_def_info.get("tool_name")
-        handler_func = INDICATOR_TOOL_HANDLERS.get(tool_name)
-
-        if not tool_name:
-            logger.warning("Found an indicator tool definition without a 'tool_name'. Skipping.")
-            continue
-        if not handler_func:
-            logger.warning(f"No handler function found for indicator tool '{tool_name}'. Skipping.")
-            continue
+    for tool_name, description, handler_func in INDICATOR_REGISTRATION_PLAN:
         try:
             # FastMCP infers input_schema and output_schema from type hints and docstrings
             # of the handler_func. We only need to pass name and description.
             mcp_instance.tool(
                 name=tool_name,
-                description=tool_def_info.get("description")
+                description=description
             )(handler_func)
-            logger.info(f"Indicator Tool '{tool_name}' registered successfully.")
+            logger.info("Indicator Tool '%s' registered successfully.", tool_name)
             registered_count += 1
         except Exception as e:
-            logger.error(f"Failed to register indicator tool '{tool_name}': {e}", exc_info=True)
+            logger.error("Failed to register indicator tool '%s': %s", tool_name, e, exc_info=True)
     
     if registered_count == 0:
         logger.warning("No indicator tools were successfully registered.")
     else:
-        logger.info(f"Successfully registered {registered_count} indicator tool(s).")
+        logger.info("Successfully registered %d indicator tool(s).", registered_count)
+    return registered_count